@@ -0,0 +1,104 @@
+# backend/ai_cache.py
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+
+CACHE_DIR = Path(__file__).parent / "ai_cache"
+
+# In-memory LRU size (entries), and whether results are also kept on disk under backend/ai_cache/
+CACHE_SIZE = int(os.environ.get('AI_CACHE_SIZE', '4096'))
+CACHE_DISK = os.environ.get('AI_CACHE_DISK', 'false').lower() == 'true'
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form used for cache keys: NFC, trimmed, whitespace collapsed.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def hash_file(path, chunk_size=1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache of AI analysis results.
+    Keys are SHA-256 over (model name, model version, content digest), so a
+    model upgrade never serves stale results.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE, cache_dir=CACHE_DIR if CACHE_DISK else None):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name, model_version, content_digest):
+        return hashlib.sha256(f"{model_name}\0{model_version}\0{content_digest}".encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._remember(key, result)
+        self._write_disk(key, result)
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ---------- DISK TIER ----------
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)["result"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key, result):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"result": result}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing AI cache entry: {e}")
@@ -1,87 +1,425 @@
 # backend/ai_module.py
+import contextlib
+import hashlib
+import io
 import os
+import threading
+import time
 import warnings
+from typing import NamedTuple
 from PIL import Image
+try:
+    from backend.ai_cache import AnalysisCache, normalize_text, hash_file
+except ImportError:
+    from ai_cache import AnalysisCache, normalize_text, hash_file
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
 
 # Check for Mock Mode (for low-memory environments like Render Free Tier)
 MOCK_MODE = os.environ.get('MOCK_AI', 'false').lower() == 'true'
+# Simulated model latency per batch in mock mode, for load tests (e.g. tests/benchmark_async_serving.py)
+MOCK_LATENCY = float(os.environ.get('MOCK_AI_LATENCY_MS', '0')) / 1000
+
+TEXT_MODEL = "unitary/toxic-bert"
+IMAGE_MODEL = "google/vit-base-patch16-224"
+# Bump when the post-processing of model outputs changes, to invalidate cached results.
+ANALYSIS_VERSION = "3"
+
+# Longest side of the in-memory copy handed to the image classifier (ViT resizes to 224 anyway)
+IMAGE_PREVIEW_SIZE = 384
+
+# Long descriptions are scored as overlapping token windows of the model's max length
+# (512 for BERT); per-label window scores are combined with "max" or "mean".
+TEXT_WINDOW_OVERLAP = int(os.environ.get('AI_TEXT_WINDOW_OVERLAP', '128'))
+TEXT_AGGREGATION = os.environ.get('AI_TEXT_AGGREGATION', 'max').lower()
+# Windows go through the model AI_TEXT_WINDOW_BATCH at a time, so one huge
+# description can't blow up the memory of a forward pass. Every window is scored
+# unless AI_TEXT_MAX_WINDOWS > 0 caps the time spent per description; results
+# for descriptions cut short by the cap say so.
+TEXT_MAX_WINDOWS = max(0, int(os.environ.get('AI_TEXT_MAX_WINDOWS', '0')))
+TEXT_WINDOW_BATCH = max(1, int(os.environ.get('AI_TEXT_WINDOW_BATCH', '16')))
+
+# Inference profile:
+#   "fp32"     -> models as published, default torch threading (original behaviour)
+#   "cpu-int8" -> dynamic int8 quantization of Linear layers + per-worker thread limits
+AI_PROFILE = os.environ.get('AI_PROFILE', 'fp32').lower()
+# Threads per worker process. In cpu-int8 mode the intra-op default splits the cores
+# between gunicorn workers (WEB_CONCURRENCY) instead of letting each one grab them all.
+_workers = max(1, int(os.environ.get('WEB_CONCURRENCY', '1')))
+TORCH_THREADS = int(os.environ.get('AI_TORCH_THREADS', '0')) or (
+    max(1, (os.cpu_count() or 1) // _workers) if AI_PROFILE == "cpu-int8" else 0)
+TORCH_INTEROP_THREADS = int(os.environ.get('AI_TORCH_INTEROP_THREADS', '0')) or (
+    1 if AI_PROFILE == "cpu-int8" else 0)
 
 text_classifier = None
 image_classifier = None
+analysis_cache = AnalysisCache()
+
+# Models are loaded lazily on first use, or up front via preload_models()
+# (e.g. in the gunicorn master before fork so workers share the weights).
+_models_loaded = False
+_load_lock = threading.Lock()
+_threads_configured_pid = None
 
 if MOCK_MODE:
     print("WARNING: Running in MOCK AI MODE. Real models will not be loaded.")
-else:
-    print("Loading AI models... this may take a moment.")
-    try:
-        from transformers import pipeline
-        try:
-            text_classifier = pipeline("text-classification", model="unitary/toxic-bert", return_all_scores=True)
-            print("AI Text model loaded successfully.")
-        except Exception as e:
-            print(f"Error loading AI Text model: {e}")
 
+
+def preload_models():
+    """
+    Loads both pipelines if they are not loaded yet. Safe to call repeatedly.
+    """
+    global text_classifier, image_classifier, MOCK_MODE, _models_loaded
+    if _models_loaded:
+        return
+    with _load_lock:
+        if _models_loaded:
+            return
+        if not MOCK_MODE:
+            print("Loading AI models... this may take a moment.")
+            try:
+                from transformers import pipeline
+                try:
+                    text_classifier = apply_profile(pipeline("text-classification", model=TEXT_MODEL, return_all_scores=True))
+                    print("AI Text model loaded successfully.")
+                except Exception as e:
+                    print(f"Error loading AI Text model: {e}")
+
+                try:
+                    image_classifier = apply_profile(pipeline("image-classification", model=IMAGE_MODEL))
+                    print("AI Image model loaded successfully.")
+                except Exception as e:
+                    print(f"Error loading AI Image model: {e}")
+
+            except ImportError:
+                print("Transformers library not found. Falling back to mock mode.")
+                MOCK_MODE = True
+        _models_loaded = True
+
+
+def warmup():
+    """
+    Loads the models and runs one dummy inference through each, so the first
+    real report does not pay for lazy initialisation.
+    """
+    preload_models()
+    if MOCK_MODE:
+        return
+    if text_classifier:
+        run_pipeline(text_classifier, ["warm-up"])
+    if image_classifier:
+        run_pipeline(image_classifier, [Image.new("RGB", (224, 224))])
+    print("AI models warmed up.")
+
+
+# ---------- INFERENCE PROFILE ----------
+
+def apply_profile(classifier, profile=None):
+    """
+    Applies the inference profile to a loaded pipeline. For "cpu-int8" the
+    model's nn.Linear layers are replaced by dynamically quantized int8 ones.
+    """
+    if (profile or AI_PROFILE) != "cpu-int8":
+        return classifier
+    import torch
+    classifier.model = torch.quantization.quantize_dynamic(classifier.model, {torch.nn.Linear}, dtype=torch.qint8)
+    print(f"Applied dynamic int8 quantization to {classifier.model.__class__.__name__}.")
+    return classifier
+
+
+def configure_threads():
+    """
+    Applies the torch thread limits once per process. Must run after fork,
+    so it is invoked lazily before the first inference in each worker.
+    """
+    global _threads_configured_pid
+    if _threads_configured_pid == os.getpid():
+        return
+    _threads_configured_pid = os.getpid()
+    if not (TORCH_THREADS or TORCH_INTEROP_THREADS):
+        return
+    import torch
+    if TORCH_THREADS:
+        torch.set_num_threads(TORCH_THREADS)
+    if TORCH_INTEROP_THREADS:
         try:
-            image_classifier = pipeline("image-classification", model="google/vit-base-patch16-224")
-            print("AI Image model loaded successfully.")
-        except Exception as e:
-            print(f"Error loading AI Image model: {e}")
-            
+            torch.set_num_interop_threads(TORCH_INTEROP_THREADS)
+        except RuntimeError:
+            # Can only be set before the first inter-op parallel work in this process.
+            pass
+
+
+def run_pipeline(classifier, inputs, **kwargs):
+    configure_threads()
+    with _inference_mode():
+        return classifier(inputs, **kwargs)
+
+
+def _inference_mode():
+    try:
+        import torch
     except ImportError:
-        print("Transformers library not found. Falling back to mock mode.")
-        MOCK_MODE = True
+        return contextlib.nullcontext()
+    return torch.inference_mode()
+
+
+def model_status() -> str:
+    """
+    Cheap status for health checks; never triggers a model load.
+    """
+    if MOCK_MODE:
+        return "mock"
+    if not _models_loaded:
+        return "loading" if _load_lock.locked() else "not_loaded"
+    return "ready" if text_classifier and image_classifier else "degraded"
 
 
 def analyze_text(text: str) -> str:
     """
     Analyzes text for toxicity.
     """
-    if not text:
-        return "No text provided."
+    return analyze_texts([text])[0]
+
 
+def analyze_texts(texts: list[str]) -> list[str]:
+    """
+    Analyzes a batch of texts for toxicity with a single pipeline call.
+    Returns one result string per input, in order.
+    """
+    results = ["No text provided."] * len(texts)
+    pending = [i for i, text in enumerate(texts) if text]
+    if not pending:
+        return results
+
+    preload_models()
     if MOCK_MODE:
         # Simple keyword matching for demo purposes
+        time.sleep(MOCK_LATENCY)
         bad_words = ['stupid', 'idiot', 'hate', 'kill', 'ugly']
-        if any(word in text.lower() for word in bad_words):
-            return "Potential bullying detected. Flags: toxic, insult (MOCK)"
-        return "No clear bullying indicators detected in text. (MOCK)"
+        for i in pending:
+            if any(word in texts[i].lower() for word in bad_words):
+                results[i] = "Potential bullying detected. Flags: toxic, insult (MOCK)"
+            else:
+                results[i] = "No clear bullying indicators detected in text. (MOCK)"
+        return results
 
     if not text_classifier:
-        return "AI Model not available. (Check logs)"
+        for i in pending:
+            results[i] = "AI Model not available. (Check logs)"
+        return results
+
+    # Identical descriptions (after normalization) are answered from the cache
+    # Window settings change the result too, so results cached under other settings don't match
+    version = _model_version(text_classifier, f"{TEXT_AGGREGATION}:{TEXT_WINDOW_OVERLAP}:{TEXT_MAX_WINDOWS}")
+    keys = {}
+    for i in pending:
+        digest = hashlib.sha256(normalize_text(texts[i]).encode()).hexdigest()
+        keys[i] = AnalysisCache.make_key(TEXT_MODEL, version, digest)
+    pending = _fill_from_cache(pending, keys, results)
+    if not pending:
+        return results
 
     try:
-        results = text_classifier(text[:512]) # Truncate to 512 tokens for BERT
-        scores = results[0]
-        toxic_labels = [item['label'] for item in scores if item['score'] > 0.5 and item['label'] != 'neutral']
-        
-        if toxic_labels:
-            return f"Potential bullying detected. Flags: {', '.join(toxic_labels)}"
-        
-        return "No clear bullying indicators detected in text."
+        truncated = []
+        outputs = score_texts(text_classifier, [texts[i] for i in pending], truncated=truncated)
+        for i, scores, cut in zip(pending, outputs, truncated):
+            results[i] = _format_text_scores(scores, cut)
+            analysis_cache.put(keys[i], results[i])
     except Exception as e:
-        return f"Error during analysis: {str(e)}"
+        for i in pending:
+            results[i] = f"Error during analysis: {str(e)}"
+    return results
 
 
-def analyze_image(image_path: str | None) -> str:
+def score_texts(classifier, texts, aggregation=None, truncated=None):
+    """
+    Scores whole texts with a text-classification pipeline's model.
+    Every text is split into overlapping windows of up to 512 tokens (at most
+    TEXT_MAX_WINDOWS per text if set), the windows of all texts go through the
+    model in batches of TEXT_WINDOW_BATCH, and the per-label scores of each
+    text's windows are aggregated. Returns pipeline-shaped output: one list of
+    {"label", "score"} per text. If `truncated` is a list, one bool per text is
+    appended to it: whether the window cap left part of that text unscored.
+    """
+    import torch
+
+    tokenizer, model = classifier.tokenizer, classifier.model
+    aggregation = aggregation or TEXT_AGGREGATION
+
+    windows, owners = [], []
+    for owner, text in enumerate(texts):
+        text_windows, cut = _token_windows(tokenizer, text)
+        for window in text_windows:
+            windows.append(window)
+            owners.append(owner)
+        if truncated is not None:
+            truncated.append(cut)
+
+    configure_threads()
+    with _inference_mode():
+        logits = []
+        for start in range(0, len(windows), TEXT_WINDOW_BATCH):
+            inputs = tokenizer.pad({"input_ids": windows[start:start + TEXT_WINDOW_BATCH]}, return_tensors="pt")
+            logits.append(model(**inputs).logits)
+        logits = torch.cat(logits)
+        if model.config.problem_type == "multi_label_classification" or model.config.num_labels == 1:
+            window_scores = torch.sigmoid(logits)
+        else:
+            window_scores = torch.softmax(logits, dim=-1)
+
+    owners = torch.tensor(owners)
+    labels = model.config.id2label
+    outputs = []
+    for owner in range(len(texts)):
+        scores = window_scores[owners == owner]
+        combined = scores.max(dim=0).values if aggregation == "max" else scores.mean(dim=0)
+        outputs.append([{"label": labels[j], "score": float(combined[j])} for j in range(len(labels))])
+    return outputs
+
+
+def _token_windows(tokenizer, text):
+    """
+    Splits text into overlapping token windows, each wrapped in the model's special tokens.
+    Returns (windows, truncated); with TEXT_MAX_WINDOWS set, text beyond that many
+    windows is not scored and truncated is True.
+    """
+    max_length = min(tokenizer.model_max_length, 512)
+    size = max_length - tokenizer.num_special_tokens_to_add()
+    overlap = min(TEXT_WINDOW_OVERLAP, size // 2)
+    step = size - overlap
+
+    ids = tokenizer(text, add_special_tokens=False, truncation=False, verbose=False)["input_ids"]
+    truncated = False
+    if TEXT_MAX_WINDOWS:
+        max_tokens = size + (TEXT_MAX_WINDOWS - 1) * step
+        truncated = len(ids) > max_tokens
+        ids = ids[:max_tokens]
+    starts = [0] if len(ids) <= size else range(0, len(ids) - overlap, step)
+    return [tokenizer.build_inputs_with_special_tokens(ids[start:start + size]) for start in starts], truncated
+
+
+def _format_text_scores(scores, truncated=False) -> str:
+    toxic_labels = [item['label'] for item in scores if item['score'] > 0.5 and item['label'] != 'neutral']
+    # Only the beginning was scored, so "nothing found" is not a statement about the rest
+    note = " (only the beginning of a very long description was analyzed)" if truncated else ""
+
+    if toxic_labels:
+        return f"Potential bullying detected. Flags: {', '.join(toxic_labels)}{note}"
+
+    return f"No clear bullying indicators detected in text.{note}"
+
+
+class PreparedImage(NamedTuple):
+    """
+    A decoded, downscaled image plus the SHA-256 of the original file bytes,
+    so analysis neither reopens nor re-hashes the upload.
+    """
+    image: Image.Image
+    sha256: str
+
+
+def prepare_image(data: bytes, sha256: str) -> PreparedImage | None:
+    """
+    Decodes image bytes straight into a downscaled RGB copy. Returns None if
+    the bytes are not a readable image.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        # For JPEGs this lets the decoder skip work by decoding at reduced scale
+        image.draft("RGB", (IMAGE_PREVIEW_SIZE, IMAGE_PREVIEW_SIZE))
+        image = image.convert("RGB")
+        image.thumbnail((IMAGE_PREVIEW_SIZE, IMAGE_PREVIEW_SIZE))
+        return PreparedImage(image, sha256)
+    except Exception:
+        return None
+
+
+def analyze_image(image_path: str | PreparedImage | None) -> str:
     """
     Analyzes image.
     """
-    if not image_path:
-        return "No image provided for analysis."
-    
+    return analyze_images([image_path])[0]
+
+
+def analyze_images(image_paths: list[str | PreparedImage | None]) -> list[str]:
+    """
+    Analyzes a batch of images with a single pipeline call. Each item is a file
+    path or a PreparedImage. Returns one result string per input, in order.
+    """
+    results = ["No image provided for analysis."] * len(image_paths)
+    pending = [i for i, path in enumerate(image_paths) if path]
+    if not pending:
+        return results
+
+    preload_models()
     if MOCK_MODE:
-        return "Image Analysis: school_supplies (0.95), classroom (0.88) (MOCK)"
-    
+        time.sleep(MOCK_LATENCY)
+        for i in pending:
+            results[i] = "Image Analysis: school_supplies (0.95), classroom (0.88) (MOCK)"
+        return results
+
     if not image_classifier:
-        return "AI Image Model not available."
+        for i in pending:
+            results[i] = "AI Image Model not available."
+        return results
+
+    # The same photo forwarded by several students is answered from the cache
+    version = _model_version(image_classifier)
+    keys = {}
+    for i in list(pending):
+        item = image_paths[i]
+        try:
+            digest = item.sha256 if isinstance(item, PreparedImage) else hash_file(item)
+            keys[i] = AnalysisCache.make_key(IMAGE_MODEL, version, digest)
+        except OSError as e:
+            results[i] = f"Error during image analysis: {str(e)}"
+            pending.remove(i)
+    pending = _fill_from_cache(pending, keys, results)
+
+    # Open each file separately so one unreadable upload (e.g. a video) only fails itself
+    images = {}
+    for i in pending:
+        item = image_paths[i]
+        if isinstance(item, PreparedImage):
+            images[i] = item.image
+            continue
+        try:
+            images[i] = Image.open(item).convert("RGB")
+        except Exception as e:
+            results[i] = f"Error during image analysis: {str(e)}"
+    if not images:
+        return results
 
     try:
-        image = Image.open(image_path)
-        results = image_classifier(image)
-        top_labels = [f"{res['label']} ({res['score']:.2f})" for res in results[:3]]
-        return f"Image Analysis: {', '.join(top_labels)}"
+        outputs = run_pipeline(image_classifier, list(images.values()), batch_size=len(images))
+        for i, predictions in zip(images, outputs):
+            top_labels = [f"{res['label']} ({res['score']:.2f})" for res in predictions[:3]]
+            results[i] = f"Image Analysis: {', '.join(top_labels)}"
+            analysis_cache.put(keys[i], results[i])
     except Exception as e:
-        return f"Error during image analysis: {str(e)}"
+        for i in images:
+            results[i] = f"Error during image analysis: {str(e)}"
+    return results
+
+
+# ---------- RESULT CACHE ----------
+
+def _model_version(classifier, settings="") -> str:
+    revision = getattr(getattr(classifier.model, "config", None), "_commit_hash", None)
+    version = f"{revision or 'unknown'}:{AI_PROFILE}:{ANALYSIS_VERSION}"
+    return f"{version}:{settings}" if settings else version
+
+
+def _fill_from_cache(pending, keys, results):
+    """
+    Fills results for cached items and returns the indexes that still need inference.
+    """
+    misses = []
+    for i in pending:
+        cached = analysis_cache.get(keys[i])
+        if cached is None:
+            misses.append(i)
+        else:
+            results[i] = cached
+    return misses
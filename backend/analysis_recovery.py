@@ -0,0 +1,124 @@
+# backend/analysis_recovery.py
+import os
+import threading
+import time
+
+
+# ASYNC_ANALYSIS keeps queued analyses in memory only. Reports still pending after
+# this long (e.g. their worker exited or was recycled) are queued again.
+RETRY_SECONDS = float(os.environ.get('AI_PENDING_RETRY_SECONDS', '300'))
+SWEEP_SECONDS = float(os.environ.get('AI_PENDING_SWEEP_SECONDS', '60'))
+
+ANALYZED = "AI Analyzed"
+
+
+class PendingAnalyses:
+    """
+    Reports whose "Created" block carries the pending marker and that have no
+    "AI Analyzed" block yet, maintained from new blocks (register on_block as a
+    Blockchain listener) after one scan of the chain.
+
+    The sweeper hands each report pending for longer than RETRY_SECONDS, and not
+    queued by this process, back to `requeue(report_id, created_data)`. Several
+    workers may retry the same report; record_if_pending() keeps only the first result.
+    """
+
+    def __init__(self, blockchain, marker, requeue):
+        self.blockchain = blockchain
+        self.marker = marker
+        self.requeue = requeue
+        self._lock = blockchain._lock  # listeners already run under it
+        self._queued = {}  # report_id -> time queued in this process
+        self._sweeper_pid = None
+        self._rebuild()
+
+    def _rebuild(self):
+        self._pending = {}  # report_id -> creation timestamp
+        with self._lock:
+            self._summaries = self.blockchain.report_summaries
+            for block in self.blockchain.chain:
+                self._apply(block)
+
+    def _check_rebuilt(self):
+        # A full chain reload swaps the index objects without notifying listeners
+        if self._summaries is not self.blockchain.report_summaries:
+            self._rebuild()
+
+    def _apply(self, block):
+        report_id = block.get("report_id")
+        if report_id is None:
+            return
+        if block["action_type"] == "Created":
+            if (block.get("data") or {}).get("ai_text") == self.marker:
+                self._pending[report_id] = block["timestamp"]
+        elif block["action_type"] == ANALYZED:
+            self._pending.pop(report_id, None)
+            self._queued.pop(report_id, None)
+
+    def on_block(self, block):
+        with self._lock:
+            self._check_rebuilt()
+            self._apply(block)
+
+    def mark_queued(self, report_id):
+        with self._lock:
+            self._queued[report_id] = time.time()
+
+    def stale(self, now=None, retry_after=RETRY_SECONDS):
+        """
+        Report ids pending for longer than retry_after and not queued by this
+        process within that time, oldest first.
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._check_rebuilt()
+            return [
+                report_id for report_id, created in sorted(self._pending.items(), key=lambda item: item[1])
+                if created < now - retry_after and self._queued.get(report_id, 0) < now - retry_after
+            ]
+
+    def record_if_pending(self, report_id, data):
+        """
+        Appends the "AI Analyzed" block unless another worker already did.
+        Returns the block, or None.
+        """
+        def not_analyzed(blockchain):
+            # Re-checked under the journal lock, after catching up with other workers
+            return not any(b["action_type"] == ANALYZED for b in blockchain.get_report_timeline(report_id))
+
+        return self.blockchain.create_block_if(not_analyzed, ANALYZED, report_id, "System", data)
+
+    def sweep(self, now=None):
+        """
+        Queues every stale pending report again. Returns the number queued.
+        """
+        self.blockchain.refresh()
+        queued = 0
+        for report_id in self.stale(now):
+            timeline = self.blockchain.get_report_timeline(report_id)
+            created = next((b for b in timeline if b["action_type"] == "Created"), None)
+            if created is None:
+                continue
+            self.mark_queued(report_id)
+            self.requeue(report_id, created.get("data") or {})
+            queued += 1
+        return queued
+
+    def start_sweeper(self, interval=SWEEP_SECONDS):
+        """
+        Starts the sweeper thread once per process (call after fork under gunicorn).
+        """
+        if self._sweeper_pid == os.getpid():
+            return
+        self._sweeper_pid = os.getpid()
+        threading.Thread(target=self._sweep_loop, args=(interval,), name="ai-pending-sweeper", daemon=True).start()
+
+    def _sweep_loop(self, interval):
+        while True:
+            try:
+                queued = self.sweep()
+                if queued:
+                    print(f"Re-queued AI analysis for {queued} pending report(s).")
+            except Exception as e:
+                print(f"WARNING: Pending AI analysis sweep failed: {e}")
+            time.sleep(interval)
@@ -1,30 +1,173 @@
 # backend/app.py
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Request, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 try:
     from backend.blockchain_module import Blockchain
-    from backend.ai_module import analyze_text, analyze_image
+    from backend.inference_worker import InferenceWorker
+    from backend.evidence_store import EvidenceStore
+    from backend import ai_module
+    from backend import event_stream
+    from backend.response_cache import ResponseCache
+    from backend import sla_tracker as sla
+    from backend.auth_cache import TokenCache
+    from backend.password_hasher import HasherBusy, PasswordHasher
+    from backend import metrics
+    from backend.request_profiler import RequestProfiler
+    from backend.analysis_recovery import PendingAnalyses
 except ImportError:
     from blockchain_module import Blockchain
-    from ai_module import analyze_text, analyze_image
+    from inference_worker import InferenceWorker
+    from evidence_store import EvidenceStore
+    import ai_module
+    import event_stream
+    from response_cache import ResponseCache
+    import sla_tracker as sla
+    from auth_cache import TokenCache
+    from password_hasher import HasherBusy, PasswordHasher
+    import metrics
+    from request_profiler import RequestProfiler
+    from analysis_recovery import PendingAnalyses
 import hashlib
 import os
+import queue
+import threading
 import uuid
 import time
 import jwt
 import datetime
+from collections.abc import Mapping
 from functools import wraps
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class ChainJSONProvider(DefaultJSONProvider):
+    """
+    Serializes compact blocks (CHAIN_COMPACT_BLOCKS) like the dicts they stand in for.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Mapping):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+
+class EvidenceRequest(Request):
+    """
+    Writes uploaded files straight into the evidence store's tmp dir while the
+    multipart body is parsed, hashing them on the way, instead of letting werkzeug
+    spool them to its own temp file (or memory) first.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return evidence_store.open_upload(content_type)
+
 
 app = Flask(__name__)
+app.request_class = EvidenceRequest
+app.json = ChainJSONProvider(app)
 CORS(app)  # allow requests from frontend files
 app.config['SECRET_KEY'] = 'your_secret_key_here_change_this_in_prod'  # TODO: Move to env var
+# Requests larger than this are rejected with 413 before the body is read
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', '50')) * 1024 * 1024
 
 blockchain = Blockchain()
-
-UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), "uploads")
+inference_worker = InferenceWorker()  # batches AI analyses across concurrent requests
+block_broadcaster = event_stream.BlockBroadcaster()  # pushes new blocks to /events streams
+blockchain.add_listener(block_broadcaster.publish)
+listing_cache = ResponseCache()  # serialized /get_reports bodies by ETag
+sla_tracker = sla.SLATracker(blockchain)  # open reports by deadline
+blockchain.add_listener(sla_tracker.on_block)
+token_cache = TokenCache()  # verified JWT -> user; dropped on re-registration
+blockchain.add_listener(token_cache.on_block)
+password_hasher = PasswordHasher()  # bounded pool for the slow password hashing
+request_profiler = RequestProfiler()  # samples PROFILE_SAMPLE_RATE of requests (off by default)
+
+# When enabled, /submit_report returns as soon as the "Created" block is appended and
+# the AI results are recorded later as a separate "AI Analyzed" block.
+ASYNC_ANALYSIS = os.environ.get('ASYNC_ANALYSIS', 'false').lower() == 'true'
+AI_PENDING = "Pending AI analysis..."
+
+UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', os.path.join(os.path.dirname(__file__), "uploads"))
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+evidence_store = EvidenceStore(UPLOAD_FOLDER)  # content-addressed, deduplicated
+EVIDENCE_MAX_AGE = 365 * 24 * 3600
+
+
+def queue_analysis(report_id, description, image_input):
+    """
+    Queues the AI analysis of a report created with AI_PENDING; the results are
+    appended as its "AI Analyzed" block.
+    """
+    def record_ai_results(ai_text, ai_image):
+        pending_analyses.record_if_pending(report_id, {
+            "ai_text": ai_text,
+            "ai_image": ai_image,
+        })
+
+    inference_worker.analyze_async(description, image_input, record_ai_results)
+
+
+def requeue_analysis(report_id, report_data):
+    # Retried from the stored evidence (the in-memory preview is gone with the old worker)
+    queue_analysis(report_id, report_data.get("description"), evidence_store.path_for(report_data["evidence"]))
+
+
+# Reports still waiting for their "AI Analyzed" block; queued again if their worker died
+pending_analyses = PendingAnalyses(blockchain, AI_PENDING, requeue_analysis) if ASYNC_ANALYSIS else None
+if pending_analyses is not None:
+    blockchain.add_listener(pending_analyses.on_block)
+
+
+@app.before_request
+def start_request_metrics():
+    # Registered first so the timing includes the chain refresh below
+    g.request_started = time.perf_counter()
+    request_profiler.start()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        route, method = request_route(), request.method
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, method=method)
+        metrics.HTTP_REQUESTS.inc(route=route, method=method, status=response.status_code)
+    # Stop here, on the thread that started it: a streamed body (/events) is iterated
+    # later, possibly on another thread (backend.asgi), and its teardown runs there.
+    request_profiler.stop(f"{request.method} {request_route()}")
+    return response
+
+
+@app.teardown_request
+def stop_request_profiler(exc):
+    # Requests that never reached after_request; a no-op otherwise
+    request_profiler.stop(f"{request.method} {request_route()}")
+
+
+def request_route():
+    # The URL rule ("/get_report/<report_id>"), not the path, to keep label cardinality bounded
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+@app.before_request
+def refresh_chain():
+    # Pick up blocks appended by other gunicorn workers (journal mode; one stat() when idle)
+    blockchain.refresh()
+
+
+@app.errorhandler(HasherBusy)
+def hasher_busy(e):
+    response = jsonify({"error": "Too many sign-ins right now, please try again shortly"})
+    response.headers["Retry-After"] = "2"
+    return response, 503
+
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    limit_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({"error": f"Upload too large (max {limit_mb} MB)"}), 413
 
 
 # ---------- AUTH DECORATOR ----------
@@ -37,10 +180,21 @@ def token_required(f):
             auth_header = request.headers['Authorization']
             if auth_header.startswith("Bearer "):
                 token = auth_header.split(" ")[1]
+        if not token and request.endpoint == "events":
+            # EventSource cannot set headers, so /events (and only /events: query
+            # strings end up in access logs) passes the token as a query param
+            token = request.args.get("token")
         
         if not token:
             return jsonify({'error': 'Token is missing!'}), 401
-        
+
+        # Fast path: this token was verified recently and the user hasn't re-registered
+        # since (the before_request refresh has applied other workers' Register blocks).
+        current_user = token_cache.get(token)
+        if current_user is not None:
+            return f(current_user, *args, **kwargs)
+
+        generation = token_cache.generation()
         try:
             data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
             current_user = blockchain.get_user(data['user_id'])
@@ -48,7 +202,8 @@ def token_required(f):
                  return jsonify({'error': 'User not found!'}), 401
         except Exception as e:
             return jsonify({'error': 'Token is invalid!'}), 401
-        
+
+        token_cache.put(token, current_user, data.get('exp'), generation=generation)
         return f(current_user, *args, **kwargs)
     
     return decorated
@@ -80,8 +235,8 @@ def register():
     # if blockchain.get_user(user_id):
     #    return jsonify({"error": "User already exists"}), 400
 
-    # Secure password hashing
-    password_hash = generate_password_hash(password_raw)
+    # Secure password hashing (on the bounded hashing pool; 503 if it is saturated)
+    password_hash = password_hasher.hash(password_raw)
 
     user_data = {
         "user_id": user_id,
@@ -111,7 +266,7 @@ def login():
         return jsonify({"error": "User not found"}), 401
 
     # Verify password hash
-    if not check_password_hash(user["password_hash"], password_raw):
+    if not password_hasher.verify(user["password_hash"], password_raw):
         return jsonify({"error": "Invalid password"}), 401
 
     # Verify device hash
@@ -121,6 +276,10 @@ def login():
     if stored_device_hash and request_device_hash != stored_device_hash:
          return jsonify({"error": "Login failed: Unrecognized device. Please register again."}), 403
 
+    # Only once every check has passed, so a rejected login never appends a block
+    if password_hasher.needs_rehash(user["password_hash"]):
+        rehash_password(user, password_raw)
+
     # Generate JWT
     token = jwt.encode({
         'user_id': user['user_id'],
@@ -136,6 +295,24 @@ def login():
     })
 
 
+def rehash_password(user, password_raw):
+    """
+    Upgrades a hash made with older PASSWORD_HASH_METHOD parameters by appending a
+    new "Register" block with the same details, in the background so login isn't slowed.
+    """
+    def record(password_hash):
+        # Skip if the user re-registered meanwhile (their newer block wins)
+        blockchain.create_block_if(
+            lambda bc: bc.get_user(user["user_id"]) == user,
+            "Register", None, "System", dict(user, password_hash=password_hash),
+        )
+
+    try:
+        password_hasher.hash_async(password_raw, record)
+    except HasherBusy:
+        pass  # try again on a later login
+
+
 # ---------- REPORT SUBMISSION ----------
 
 @app.route("/submit_report", methods=["POST"])
@@ -168,20 +345,29 @@ def submit_report(current_user):
     report_id = str(uuid.uuid4())
 
     safe_name = secure_filename(evidence.filename)
-    evidence_filename = f"{report_id}_{safe_name}"
-    evidence_path = os.path.join(UPLOAD_FOLDER, evidence_filename)
-    evidence.save(evidence_path)
+    stored = evidence_store.save(evidence, safe_name)
+    evidence_path = evidence_store.path_for(stored.name)
+
+    # Images go to the classifier as a downscaled in-memory copy; anything else by path
+    image_input = evidence_path
+    if stored.image_bytes is not None:
+        image_input = ai_module.prepare_image(stored.image_bytes, stored.sha256) or evidence_path
 
-    # AI analysis
-    ai_text = analyze_text(description)
-    ai_image = analyze_image(evidence_path)
+    # AI analysis (queued and micro-batched with other in-flight reports)
+    if ASYNC_ANALYSIS:
+        ai_text = ai_image = AI_PENDING
+    else:
+        ai_text, ai_image = inference_worker.analyze(description, image_input)
 
     report_data = {
         "reporter_email": reporter_email,
         "student_id": student_id,
         "description": description,
         "witness": witness,
-        "evidence": evidence_filename,
+        "evidence": stored.name,
+        "evidence_name": safe_name,
+        "evidence_sha256": stored.sha256,
+        "evidence_size": stored.size,
         "date_submitted": date_submitted,
         "ai_text": ai_text,
         "ai_image": ai_image,
@@ -191,6 +377,11 @@ def submit_report(current_user):
 
     blockchain.create_block("Created", report_id, "Reporter", report_data)
 
+    if ASYNC_ANALYSIS:
+        pending_analyses.mark_queued(report_id)
+        queue_analysis(report_id, description, image_input)
+        return jsonify({"message": "Report submitted", "report_id": report_id, "ai_status": "pending"})
+
     return jsonify({"message": "Report submitted", "report_id": report_id})
 
 
@@ -203,6 +394,19 @@ def get_reports(current_user):
     Query params:
       role = Reporter | Admin | Validator
       (email is inferred from token for Reporter)
+
+    Optional (any of these switches to a paginated response
+    {"reports": ..., "next_cursor": ...}):
+      view   = timeline (default) | summary  (summary = latest state per report only)
+      status = comma-separated statuses, e.g. "Under Review,Need More Info"
+      from / to = creation date range (unix timestamp or ISO date)
+      actor  = Reporter | Admin | Validator | System (reports that actor acted on)
+      sla    = overdue | on_track | closed | none
+      limit  = page size (default 50, max 200)
+      cursor = next_cursor from the previous page
+
+    Delta sync: since_index = N returns {"blocks": [...], "high_water_mark": M},
+    the report blocks appended after chain index N; pass M next time.
     """
     role = request.args.get("role")
     
@@ -214,18 +418,55 @@ def get_reports(current_user):
          if current_user['role'] == 'Reporter' and role != 'Reporter':
              return jsonify({"error": "Unauthorized role access"}), 403
 
+    if role in ("Admin", "Validator") and current_user['role'] != role:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    # Conditional GET: nothing changes unless a block is appended, so the ETag is
+    # derived from the chain tip + caller + query and checked before any work.
+    tip_hash = blockchain.block_hash(blockchain.chain[-1])
+    etag = report_listing_etag(role, current_user, tip_hash)
+    if request.if_none_match.contains(etag):
+        return listing_response(None, etag, status=304)
+    body = listing_cache.get(etag)
+    if body is not None:
+        return listing_response(body, etag)
+
+    response = build_report_listing(role, current_user)
+    if isinstance(response, Response) and response.status_code == 200:
+        body = response.get_data()
+        listing_cache.put(etag, body, tip=tip_hash)
+        return listing_response(body, etag)
+    return response
+
+
+def build_report_listing(role, current_user):
+    if "since_index" in request.args:
+        if role not in ("Reporter", "Admin", "Validator"):
+            return jsonify({"error": "Invalid role"}), 400
+        try:
+            since_index = int(request.args["since_index"])
+        except ValueError:
+            return jsonify({"error": "since_index must be an integer"}), 400
+        reporter_email = current_user['user_id'] if role == "Reporter" else None
+        blocks, high_water_mark = blockchain.get_report_blocks_since(since_index, reporter_email)
+        return jsonify({"blocks": blocks, "high_water_mark": high_water_mark})
+
+    if any(param in request.args for param in REPORT_QUERY_PARAMS):
+        if role not in ("Reporter", "Admin", "Validator"):
+            return jsonify({"error": "Invalid role"}), 400
+        reporter_email = current_user['user_id'] if role == "Reporter" else None
+        return query_reports(reporter_email)
+
     if role == "Reporter":
         email = current_user['user_id']
         timelines = blockchain.get_reports_for_reporter(email)
         return jsonify(timelines)
 
     elif role == "Admin":
-        if current_user['role'] != 'Admin': return jsonify({"error": "Unauthorized"}), 403
         reports = blockchain.get_all_reports()
         return jsonify(reports)
 
     elif role == "Validator":
-        if current_user['role'] != 'Validator': return jsonify({"error": "Unauthorized"}), 403
         # Validator now sees ALL reports to oversee the workflow
         all_reports = blockchain.get_all_reports()
         return jsonify(all_reports)
@@ -233,6 +474,222 @@ def get_reports(current_user):
     return jsonify({"error": "Invalid role"}), 400
 
 
+def report_listing_etag(role, current_user, tip_hash):
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    # Only Reporter listings depend on who asks; Admin/Validator callers share entries
+    caller = current_user['user_id'] if role == "Reporter" else ""
+    key = f"{tip_hash}|{role}|{caller}|{query}"
+    if "sla" in request.args or request.args.get("view") == "summary":
+        # SLA state also changes with the clock; let those listings refresh once a minute
+        key += f"|{int(time.time() // 60)}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def listing_response(body, etag, status=200):
+    response = Response(body, status=status, mimetype="application/json")
+    response.set_etag(etag)
+    response.last_modified = datetime.datetime.fromtimestamp(blockchain.chain[-1]["timestamp"], datetime.timezone.utc)
+    # Per-user data: browsers may keep it but must revalidate every time
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+REPORT_QUERY_PARAMS = ("view", "status", "from", "to", "actor", "sla", "limit", "cursor")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def query_reports(reporter_email):
+    args = request.args
+    view = args.get("view", "timeline")
+    sla = args.get("sla")
+    if view not in ("timeline", "summary"):
+        return jsonify({"error": "view must be timeline or summary"}), 400
+    if sla is not None and sla not in ("overdue", "on_track", "closed", "none"):
+        return jsonify({"error": "sla must be overdue, on_track, closed or none"}), 400
+
+    try:
+        since = parse_time(args.get("from"))
+        until = parse_time(args.get("to"), end_of_day=True)
+        limit = min(int(args.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        cursor = int(args["cursor"]) if args.get("cursor") else None
+    except ValueError:
+        return jsonify({"error": "Invalid from/to/limit/cursor"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    status = [s.strip() for s in args["status"].split(",") if s.strip()] if args.get("status") else None
+    report_ids, next_cursor = blockchain.query_reports(
+        reporter_email=reporter_email, status=status, since=since, until=until,
+        actor=args.get("actor"), sla=sla, cursor=cursor, limit=limit,
+    )
+
+    if view == "summary":
+        reports = [summary_with_sla(blockchain.get_report_summary(rid)) for rid in report_ids]
+    else:
+        reports = {rid: blockchain.get_report_timeline(rid) for rid in report_ids}
+    return jsonify({"reports": reports, "next_cursor": next_cursor})
+
+
+def summary_with_sla(summary):
+    return dict(summary, sla_state=blockchain.sla_state(summary))
+
+
+def parse_time(value, end_of_day=False):
+    """
+    Accepts a unix timestamp or an ISO date/datetime. A bare date used as an
+    upper bound covers that whole day.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        parsed += datetime.timedelta(days=1, microseconds=-1)
+    return parsed.timestamp()
+
+
+@app.route("/get_report/<report_id>", methods=["GET"])
+@token_required
+def get_report(current_user, report_id):
+    """
+    On-demand timeline for a single report (pairs with view=summary listings).
+    """
+    summary = blockchain.get_report_summary(report_id)
+    if not summary:
+        return jsonify({"error": "Report not found"}), 404
+    if current_user['role'] == 'Reporter' and summary["reporter_email"] != current_user['user_id']:
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify({"summary": summary_with_sla(summary), "timeline": blockchain.get_report_timeline(report_id)})
+
+
+# ---------- SLA ----------
+
+@app.route("/sla/overdue", methods=["GET"])
+@token_required
+def sla_overdue(current_user):
+    """
+    Open reports past their SLA deadline, most overdue first: {"reports", "total"}.
+    Optional: limit (default 50, max 200).
+    """
+    if current_user['role'] not in ("Admin", "Validator"):
+        return jsonify({"error": "Unauthorized"}), 403
+    try:
+        limit = min(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    report_ids, total = sla_tracker.overdue(limit=limit)
+    reports = [summary_with_sla(blockchain.get_report_summary(rid)) for rid in report_ids]
+    return jsonify({"reports": reports, "total": total})
+
+
+@app.route("/sla/upcoming", methods=["GET"])
+@token_required
+def sla_upcoming(current_user):
+    """
+    Open reports due within the next `hours` (default 24), soonest first.
+    Optional: limit (default 50, max 200).
+    """
+    if current_user['role'] not in ("Admin", "Validator"):
+        return jsonify({"error": "Unauthorized"}), 403
+    try:
+        hours = float(request.args.get("hours", "24"))
+        limit = min(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "hours and limit must be numbers"}), 400
+    if limit < 1 or hours < 0:
+        return jsonify({"error": "hours and limit must be positive"}), 400
+
+    report_ids = sla_tracker.upcoming(hours * 3600, limit=limit)
+    reports = [summary_with_sla(blockchain.get_report_summary(rid)) for rid in report_ids]
+    return jsonify({"reports": reports})
+
+
+# ---------- LIVE EVENTS ----------
+
+@app.route("/events", methods=["GET"])
+@token_required
+def events(current_user):
+    """
+    Server-Sent Events stream of new report blocks (event "block", id = chain index).
+    Admin/Validator receive every report block; Reporters only their own reports.
+    Resumes after the Last-Event-ID header (or ?last_event_id=N on first connect)
+    by replaying the missed blocks from the chain.
+    """
+    role = current_user['role']
+    reporter_email = current_user['user_id'] if role == "Reporter" else None
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be a chain index"}), 400
+
+    subscriber = block_broadcaster.subscribe()
+    if subscriber is None:
+        return jsonify({"error": "Too many live connections, please poll instead"}), 503
+
+    def visible(block):
+        if block.get("report_id") is None:
+            return False
+        if reporter_email is None:
+            return True
+        summary = blockchain.get_report_summary(block["report_id"])
+        return summary is not None and summary["reporter_email"] == reporter_email
+
+    def generate():
+        last_sent = last_event_id
+        try:
+            yield f"retry: {EVENTS_RETRY_MS}\n\n"
+            if last_sent is not None:
+                missed, high_water_mark = blockchain.get_report_blocks_since(last_sent, reporter_email)
+                for block in missed:
+                    yield event_stream.format_event(block, app.json.dumps)
+                last_sent = high_water_mark
+
+            deadline = time.monotonic() + event_stream.MAX_STREAM_SECONDS
+            next_heartbeat = time.monotonic() + event_stream.HEARTBEAT_SECONDS
+            while time.monotonic() < deadline:
+                try:
+                    block = subscriber.get(timeout=1.0)
+                except queue.Empty:
+                    # Blocks appended by other workers reach the broadcaster via refresh()
+                    blockchain.refresh()
+                    if time.monotonic() >= next_heartbeat:
+                        next_heartbeat = time.monotonic() + event_stream.HEARTBEAT_SECONDS
+                        yield ": heartbeat\n\n"
+                    else:
+                        # Nothing is sent, but the server gets a chance to notice a
+                        # disconnected client every second instead of every heartbeat.
+                        yield ""
+                    continue
+                if block is event_stream.DROPPED:
+                    break  # fell behind; the client reconnects and replays from the chain
+                if last_sent is not None and block["index"] <= last_sent:
+                    continue  # already sent during the replay
+                if visible(block):
+                    yield event_stream.format_event(block, app.json.dumps)
+                last_sent = block["index"]
+        finally:
+            block_broadcaster.unsubscribe(subscriber)
+
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    response.call_on_close(lambda: block_broadcaster.unsubscribe(subscriber))
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response
+
+
+EVENTS_RETRY_MS = 3000
+
+
 # ---------- REPORT UPDATE (ADMIN & VALIDATOR) ----------
 
 @app.route("/update_report", methods=["POST"])
@@ -265,13 +722,76 @@ def update_report(current_user):
     return jsonify({"message": "Report updated"})
 
 
+# ---------- HEALTH ----------
+
+@app.route("/health")
+def health():
+    # Never blocks on model loading, so load balancer checks stay fast during boot.
+    return jsonify({"status": "ok", "models": ai_module.model_status(), "chain_length": len(blockchain.chain)})
+
+
+# ---------- METRICS & PROFILING ----------
+
+def chain_file_bytes():
+    path = blockchain.journal_file if blockchain.storage_mode == "journal" else blockchain.chain_file
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+metrics.Gauge("chain_length", "Blocks in the chain.", callback=lambda: len(blockchain.chain))
+metrics.Gauge("chain_file_bytes", "Size of chain.json or chain.jsonl on disk.", callback=chain_file_bytes)
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    # Per process: under gunicorn each scrape is answered by whichever worker picks it up
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/debug/profiling", methods=["GET", "POST"])
+@token_required
+def profiling(current_user):
+    """
+    GET: current sample rate and the latest dumps. POST {"sample_rate": 0..1 or null}
+    changes it for all workers (null reverts to PROFILE_SAMPLE_RATE).
+    """
+    if current_user['role'] != "Admin":
+        return jsonify({"error": "Unauthorized"}), 403
+    if request.method == "POST":
+        rate = (request.get_json(silent=True) or {}).get("sample_rate")
+        if rate is not None:
+            try:
+                rate = float(rate)
+            except (TypeError, ValueError):
+                return jsonify({"error": "sample_rate must be a number"}), 400
+            if not 0 <= rate <= 1:
+                return jsonify({"error": "sample_rate must be between 0 and 1"}), 400
+        request_profiler.set_sample_rate(rate)
+    return jsonify({
+        "sample_rate": request_profiler.sample_rate(),
+        "profile_dir": str(request_profiler.output_dir),
+        "profiles": request_profiler.recent_profiles(),
+    })
+
+
 # ---------- FILE SERVING ----------
 
-@app.route("/uploads/<filename>")
+@app.route("/uploads/<path:filename>")
 def uploaded_file(filename):
     # In a real app, you might want to protect this too, 
     # but for now we'll leave it open so <img> tags work easily.
-    return send_from_directory(UPLOAD_FOLDER, filename)
+    content_hash = EvidenceStore.content_hash(filename)
+    if not content_hash:
+        # Legacy "{report_id}_{filename}" uploads
+        return send_from_directory(UPLOAD_FOLDER, filename)
+
+    # Content-addressed files never change: strong ETag, cache forever, Range for video seeking
+    response = send_from_directory(UPLOAD_FOLDER, filename, etag=content_hash, max_age=EVIDENCE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 @app.route("/frontend/<path:filename>")
 def serve_frontend(filename):
@@ -280,4 +800,10 @@ def serve_frontend(filename):
 
 
 if __name__ == "__main__":
+    if os.environ.get('AI_WARMUP', 'true').lower() == 'true':
+        threading.Thread(target=ai_module.warmup, name="ai-warmup", daemon=True).start()
+    if sla.SWEEPER_ENABLED:
+        sla_tracker.start_sweeper()
+    if pending_analyses is not None:
+        pending_analyses.start_sweeper()
     app.run(debug=False)
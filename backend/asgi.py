@@ -0,0 +1,293 @@
+# backend/asgi.py
+import asyncio
+import contextvars
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from backend import ai_module
+    from backend import sla_tracker as sla
+    from backend.app import app as flask_app, pending_analyses, sla_tracker
+except ImportError:
+    import ai_module
+    import sla_tracker as sla
+    from app import app as flask_app, pending_analyses, sla_tracker
+
+
+# Threads running Flask views per process. Views mostly wait on the inference,
+# password and disk pools, so this can be well above the core count.
+ASGI_APP_THREADS = int(os.environ.get('ASGI_APP_THREADS', '32'))
+# Threads pulling chunks from streaming responses (/events, evidence files);
+# keep it above SSE_MAX_SUBSCRIBERS so live streams can't starve file downloads.
+ASGI_STREAM_THREADS = int(os.environ.get('ASGI_STREAM_THREADS', '64'))
+# Requests in flight per process (receiving, queued or running) before new ones get 503
+ASGI_MAX_REQUESTS = int(os.environ.get('ASGI_MAX_REQUESTS', '1000'))
+# Request bodies larger than this are spooled to a temp file while they arrive
+ASGI_SPOOL_BYTES = 1024 * 1024
+
+
+class AsyncServer:
+    """
+    Serves a WSGI app (the Flask routes, unchanged) over ASGI, e.g. under uvicorn.
+
+    The event loop does all the socket I/O: request bodies are received and
+    responses sent without holding a thread, so slow uploads and slow clients
+    only cost a coroutine. A request takes an app thread only once its body has
+    fully arrived, and each thread is bounded (ASGI_APP_THREADS /
+    ASGI_STREAM_THREADS) on top of the existing inference and password pools.
+    """
+
+    def __init__(self, wsgi_app, app_threads=ASGI_APP_THREADS, stream_threads=ASGI_STREAM_THREADS,
+                 max_requests=ASGI_MAX_REQUESTS, max_body=None, on_startup=None):
+        self.wsgi_app = wsgi_app
+        self.app_threads = max(1, app_threads)
+        self.stream_threads = max(1, stream_threads)
+        self.max_requests = max_requests
+        # Same limit Flask enforces (413), checked before the body is spooled
+        self.max_body = max_body if max_body is not None else getattr(wsgi_app, "config", {}).get("MAX_CONTENT_LENGTH")
+        self.on_startup = on_startup
+        self.in_flight = 0  # only touched on the event loop
+        self._app_pool = None
+        self._stream_pool = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        if self.in_flight >= self.max_requests:
+            await _send_error(send, 503, b"Server busy, please retry", [(b"retry-after", b"1")])
+            return
+        self.in_flight += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    # ---------- LIFESPAN ----------
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._start_pools()
+                if self.on_startup is not None:
+                    self.on_startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for pool in (self._app_pool, self._stream_pool):
+                    if pool is not None:
+                        pool.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _start_pools(self):
+        if self._app_pool is None:
+            self._app_pool = ThreadPoolExecutor(self.app_threads, thread_name_prefix="asgi-app")
+            self._stream_pool = ThreadPoolExecutor(self.stream_threads, thread_name_prefix="asgi-stream")
+
+    # ---------- REQUESTS ----------
+
+    async def _handle(self, scope, receive, send):
+        self._start_pools()  # servers without lifespan support
+        loop = asyncio.get_running_loop()
+        headers = [(name.decode("latin-1").lower(), value.decode("latin-1")) for name, value in scope["headers"]]
+        content_length = next((value for name, value in headers if name == "content-length"), None)
+        too_large = (self.max_body is not None and content_length is not None
+                     and content_length.isdigit() and int(content_length) > self.max_body)
+
+        if too_large:
+            body = tempfile.SpooledTemporaryFile()  # Flask answers 413 without reading it
+        else:
+            body = await self._receive_body(receive)
+            if body is None:
+                return  # client went away mid-upload
+            if self.max_body is not None and body.tell() > self.max_body:
+                body.close()
+                await _send_error(send, 413, b"Request body too large")
+                return
+            body.seek(0)
+
+        disconnected = asyncio.Event()
+        watcher = loop.create_task(_watch_disconnect(receive, disconnected, skip=too_large))
+        try:
+            environ = build_environ(scope, headers, body)
+            started = []
+
+            def start_response(status, response_headers, exc_info=None):
+                if exc_info and started:
+                    raise exc_info[1].with_traceback(exc_info[2])
+                started[:] = [status, response_headers]
+
+            result, first_chunk = await loop.run_in_executor(
+                self._app_pool, _call_app, self.wsgi_app, environ, start_response)
+            complete = False
+            try:
+                status, response_headers = started
+                await send({
+                    "type": "http.response.start",
+                    "status": int(status.split(" ", 1)[0]),
+                    "headers": [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                                for name, value in response_headers],
+                })
+                length = next((value for name, value in response_headers if name.lower() == "content-length"), None)
+                complete = first_chunk is None or (length is not None and int(length) == len(first_chunk))
+                await send({"type": "http.response.body", "body": first_chunk or b"", "more_body": not complete})
+                # Streaming bodies: pull each chunk on the stream pool, send it from the loop
+                while not complete and not disconnected.is_set():
+                    chunk = await loop.run_in_executor(self._stream_pool, _next_chunk, result)
+                    if chunk is None:
+                        break
+                    if chunk:
+                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                if not complete and not disconnected.is_set():
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+            finally:
+                if complete:
+                    result.close()
+                else:
+                    # Runs generator cleanup (e.g. /events unsubscribes) off the loop
+                    await loop.run_in_executor(self._stream_pool, result.close)
+        finally:
+            watcher.cancel()
+            body.close()
+
+    async def _receive_body(self, receive):
+        body = tempfile.SpooledTemporaryFile(max_size=ASGI_SPOOL_BYTES)
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                return None
+            chunk = message.get("body", b"")
+            if chunk:
+                # Spilling to disk is the only blocking step here; it is one write per chunk
+                body.write(chunk)
+                if self.max_body is not None and body.tell() > self.max_body:
+                    return body  # chunked upload over the limit; rejected by the caller
+            if not message.get("more_body", False):
+                return body
+
+
+def _call_app(wsgi_app, environ, start_response):
+    """
+    Runs the view in a fresh contextvars.Context and returns (response iterator,
+    first chunk or None).
+    """
+    context = contextvars.Context()
+    result = context.run(wsgi_app, environ, start_response)
+    iterator = _ClosingIterator(context, context.run(iter, result), result)
+    return iterator, _next_chunk(iterator)
+
+
+def _next_chunk(iterator):
+    try:
+        return bytes(next(iterator))
+    except StopIteration:
+        return None
+
+
+class _ClosingIterator:
+    """
+    Resumes and closes the response inside the Context the view ran in.
+    Streaming responses (stream_with_context) keep Flask's request context pushed
+    until close(), and later chunks are pulled by whichever stream pool thread is
+    free, so the context has to travel with the iterator rather than the thread.
+    """
+
+    def __init__(self, context, iterator, result):
+        self._context = context
+        self._iterator = iterator
+        self._result = result
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._context.run(next, self._iterator)
+
+    def close(self):
+        if hasattr(self._result, "close"):
+            self._context.run(self._result.close)
+
+
+async def _watch_disconnect(receive, disconnected, skip=False):
+    if skip:
+        return  # the unread body is still queued; the server closes the connection itself
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            disconnected.set()
+            return
+
+
+async def _send_error(send, status, message, headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(message)).encode())] + list(headers),
+    })
+    await send({"type": "http.response.body", "body": message})
+
+
+def build_environ(scope, headers, body):
+    """
+    WSGI environ for an ASGI http scope (PEP 3333 strings: latin-1 decoded bytes).
+    """
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("utf-8").decode("latin-1"),
+        "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in headers:
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+        elif name == "content-length":
+            environ["CONTENT_LENGTH"] = value
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def start_background_tasks():
+    # Same per-process startup as gunicorn's post_fork (uvicorn starts each worker fresh)
+    if os.environ.get('AI_WARMUP', 'true').lower() == 'true':
+        threading.Thread(target=ai_module.warmup, name="ai-warmup", daemon=True).start()
+    if sla.SWEEPER_ENABLED:
+        sla_tracker.start_sweeper()
+    if pending_analyses is not None:
+        pending_analyses.start_sweeper()
+
+
+app = AsyncServer(flask_app, on_startup=start_background_tasks)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, port=5000)
@@ -0,0 +1,92 @@
+# backend/auth_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# Verified tokens remembered per process, and for how long
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', '4096'))
+AUTH_CACHE_TTL = float(os.environ.get('AUTH_CACHE_TTL', '300'))
+
+
+class TokenCache:
+    """
+    Thread-safe LRU of verified JWTs -> resolved user record, so token_required
+    doesn't re-verify the signature on every dashboard call. Entries expire after
+    the TTL or at the token's own exp, whichever is first, and all entries of a
+    user are dropped when a newer "Register" block for them is appended
+    (register on_block as a Blockchain listener).
+
+    A lookup that races a re-registration must not cache the old record: read
+    generation() before fetching the user and pass it to put(), which skips the
+    entry if any user was invalidated in between.
+    """
+
+    def __init__(self, max_entries=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # token -> (user, expires_at)
+        self._tokens_by_user = {}      # user_id -> set of cached tokens
+        self._generation = 0           # bumped by every invalidation
+        self._lock = threading.Lock()
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def get(self, token, now=None):
+        now = now if now is not None else time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= now:
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return user
+
+    def put(self, token, user, token_exp=None, now=None, generation=None):
+        now = now if now is not None else time.time()
+        expires_at = now + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # user may have re-registered since `user` was read
+            self._remove(token)
+            self._entries[token] = (user, expires_at)
+            self._tokens_by_user.setdefault(user["user_id"], set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._generation += 1
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def on_block(self, block):
+        if block["action_type"] == "Register":
+            user_id = (block.get("data") or {}).get("user_id")
+            if user_id is not None:
+                self.invalidate_user(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[0]["user_id"]
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
@@ -1,20 +1,109 @@
 # backend/blockchain_module.py
+import atexit
+import bisect
 import json
 import hashlib
+import os
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process locking, run a single worker
+    fcntl = None
 
-CHAIN_FILE = Path(__file__).parent / "chain.json"
+try:
+    from backend import chain_snapshot, metrics
+    from backend.compact_block import LAZY_DATA_BYTES, Block, PayloadStore
+except ImportError:
+    import chain_snapshot
+    import metrics
+    from compact_block import LAZY_DATA_BYTES, Block, PayloadStore
+
+
+# Directory holding chain.json / chain.jsonl / chain.snapshot (default: next to this file)
+DATA_DIR = Path(os.environ.get('CHAIN_DATA_DIR', Path(__file__).parent))
+CHAIN_FILE = DATA_DIR / "chain.json"
+JOURNAL_FILE = DATA_DIR / "chain.jsonl"
+SNAPSHOT_FILE = DATA_DIR / "chain.snapshot"
+
+# Storage mode:
+#   "json"    -> rewrite the whole chain.json on every block (original behaviour, single process only)
+#   "journal" -> append one JSON line per block to chain.jsonl; safe with several gunicorn
+#                workers: appends are serialized with a lock file and each process picks up
+#                the others' blocks incrementally from the journal tail (see refresh()).
+STORAGE_MODE = os.environ.get('CHAIN_STORAGE', 'json').lower()
+
+# Journal durability: every block is flushed to the OS immediately, but the
+# (expensive) fsync is batched every N blocks or every T seconds, whichever comes first.
+# The T-second bound holds even if no further block arrives: the first unsynced
+# append arms a timer thread that fsyncs T seconds later.
+FSYNC_EVERY = int(os.environ.get('CHAIN_FSYNC_EVERY', '32'))
+FSYNC_INTERVAL = float(os.environ.get('CHAIN_FSYNC_INTERVAL', '1.0'))
+
+# Journal mode: write a binary snapshot of the chain and indexes every N blocks
+# (0 disables), so startup loads it and replays only the journal tail.
+SNAPSHOT_EVERY = int(os.environ.get('CHAIN_SNAPSHOT_EVERY', '10000'))
+
+# Journal mode: keep blocks in memory as compact records whose large data
+# payloads are re-read from the journal on access (see compact_block).
+COMPACT_BLOCKS = os.environ.get('CHAIN_COMPACT_BLOCKS', 'false').lower() == 'true'
+
+# Action types that change a report's status (everything else, e.g. comments, keeps it)
+STATUS_ACTIONS = {
+    "Under Review", "Need More Info", "Escalated to Validator", "Resolved",
+    "Validated", "Rejected", "Needs More Evidence",
+}
+CLOSED_STATUSES = {"Resolved", "Validated", "Rejected"}
+# Appended by the SLA sweeper (see sla_tracker); a marker, not a status change
+SLA_BREACHED = "SLA Breached"
 
 
 class Blockchain:
-    def __init__(self):
+    def __init__(self, storage_mode=None, chain_file=CHAIN_FILE, journal_file=JOURNAL_FILE,
+                 snapshot_file=SNAPSHOT_FILE, snapshot_every=SNAPSHOT_EVERY, compact=COMPACT_BLOCKS):
+        self.storage_mode = (storage_mode or STORAGE_MODE).lower()
+        if self.storage_mode not in ("json", "journal"):
+            raise ValueError(f"Unknown chain storage mode: {self.storage_mode}")
+        self.chain_file = Path(chain_file)
+        self.journal_file = Path(journal_file)
+        self.snapshot_file = Path(snapshot_file)
+        self.snapshot_every = snapshot_every
+        # Compact blocks point at their journal record, so they need journal mode
+        self.compact = compact and self.storage_mode == "journal"
+        self.payloads = PayloadStore(self.journal_file) if self.compact else None
+
         self.chain = []
-        self.load_chain()
-        if not self.chain:
-            self.create_genesis_block()
+        # Secondary indexes, kept in sync by index_block()
+        self.users = {}             # user_id -> data of latest "Register" block
+        self.report_blocks = {}     # report_id -> list of blocks (timeline)
+        self.reporter_reports = {}  # reporter_email -> list of report_ids
+        self.report_summaries = {}  # report_id -> latest state (see _update_summary)
+        self.report_order = []      # report_ids in order of first appearance
+        self.report_created = []    # creation timestamp per report_order entry (for date ranges)
+        self.report_positions = {}  # report_id -> position in report_order
+        self.reports_by_status = {} # status -> set of report_ids
+        self.reports_by_actor = {}  # actor -> set of report_ids that actor touched
+        self.listeners = []         # callables invoked with each newly appended block
+        self._lock = threading.RLock()
+        self._journal = None
+        self._journal_pid = None
+        self._journal_offset = 0    # bytes of the journal already applied to self.chain
+        self._lock_file = None
+        self._lock_file_pid = None
+        self._lock_file_depth = 0   # journal_lock() nesting in this process (guarded by _lock)
+        self._unsynced = 0
+        self._last_fsync = time.time()
+        self._fsync_timer = None
+        self._snapshot_thread = None
+
+        with self._lock, self.journal_lock():
+            self.load_chain()
+            if not self.chain:
+                self.create_genesis_block()
 
     # ---------- CORE BLOCKCHAIN ----------
 
@@ -30,10 +119,30 @@ class Blockchain:
             "previous_hash": "0",
             "sla_deadline": None,
         }
-        self.chain.append(genesis_block)
-        self.save_chain()
+        genesis_block["block_hash"] = self.hash(genesis_block)
+        self.append_block(genesis_block)
 
     def create_block(self, action_type, report_id, actor, data):
+        with metrics.CHAIN_OPERATION_SECONDS.time(operation="create_block"), self._lock, self.journal_lock():
+            # Another worker may have appended since we last looked; link onto the real tip.
+            self.refresh()
+            self.discard_torn_tail()
+            return self._create_block(action_type, report_id, actor, data)
+
+    def create_block_if(self, condition, action_type, report_id, actor, data):
+        """
+        Like create_block, but only appends if condition(self) still holds once this
+        process has caught up with the journal, so concurrent workers can't both append.
+        Returns the block, or None if the condition was false.
+        """
+        with metrics.CHAIN_OPERATION_SECONDS.time(operation="create_block"), self._lock, self.journal_lock():
+            self.refresh()
+            self.discard_torn_tail()
+            if not condition(self):
+                return None
+            return self._create_block(action_type, report_id, actor, data)
+
+    def _create_block(self, action_type, report_id, actor, data):
         previous_block = self.chain[-1]
         block = {
             "index": len(self.chain),
@@ -43,17 +152,48 @@ class Blockchain:
             "actor": actor,              # Reporter/Admin/Validator/System
             "data": data or {},
             "data_hash": self.hash_data(data or {}),
-            "previous_hash": self.hash(previous_block),
+            "previous_hash": self.block_hash(previous_block),
             "sla_deadline": self.calculate_sla() if action_type == "Created" else None,
         }
-        self.chain.append(block)
-        self.save_chain()
+        # Hash of this block's canonical serialization, computed once and stored with it
+        block["block_hash"] = self.hash(block)
+        block = self.append_block(block)
+        if self.storage_mode == "journal" and self.snapshot_every and block["index"] % self.snapshot_every == 0:
+            self.save_snapshot_in_background()
+        self.notify_listeners(block)
         return block
 
+    def add_listener(self, listener):
+        """
+        Registers listener(block), called (in order, under the append lock) for every new block.
+        """
+        self.listeners.append(listener)
+
+    def notify_listeners(self, block):
+        for listener in self.listeners:
+            try:
+                listener(block)
+            except Exception as e:
+                print(f"Error in block listener {listener}: {e}")
+
     def hash(self, block):
-        block_string = json.dumps(block, sort_keys=True).encode()
+        # block_hash is the cached result of this function, so it is never part of its input
+        # (this keeps hashes identical for chains written before the field existed).
+        if "block_hash" in block:
+            block = {k: v for k, v in block.items() if k != "block_hash"}
+        block_string = json.dumps(block, sort_keys=True, default=dict).encode()
         return hashlib.sha256(block_string).hexdigest()
 
+    def block_hash(self, block):
+        """
+        Returns the block's hash without re-serializing it: new blocks carry it as
+        block_hash; blocks from older chains get it computed once and cached in memory.
+        """
+        cached = block.get("block_hash")
+        if cached is None:
+            cached = block["block_hash"] = self.hash(block)
+        return cached
+
     def hash_data(self, data):
         data_string = json.dumps(data, sort_keys=True).encode()
         return hashlib.sha256(data_string).hexdigest()
@@ -62,16 +202,397 @@ class Blockchain:
         # 7 days from now
         return (datetime.now() + timedelta(days=7)).timestamp()
 
+    def verify_chain(self, full=False, workers=None):
+        """
+        Verifies data_hash / previous_hash links (incrementally from the last
+        signed checkpoint unless full=True). See chain_audit.verify_chain.
+        """
+        try:
+            from backend.chain_audit import verify_chain
+        except ImportError:
+            from chain_audit import verify_chain
+        return verify_chain(self, full=full, workers=workers)
+
+    # ---------- INDEXES ----------
+
+    def index_block(self, block):
+        action_type = block["action_type"]
+        data = block.get("data") or {}
+
+        if action_type == "Register":
+            user_id = data.get("user_id")
+            if user_id is not None:
+                self.users[user_id] = data
+
+        report_id = block.get("report_id")
+        if report_id is not None:
+            self.report_blocks.setdefault(report_id, []).append(block)
+            if action_type == "Created":
+                reporter_email = data.get("reporter_email")
+                if reporter_email is not None:
+                    self.reporter_reports.setdefault(reporter_email, []).append(report_id)
+            self._update_summary(report_id, block, data)
+
+        if self.compact:
+            # The indexes above were the last routine use of a large payload
+            block.release_payload()
+
+    def _update_summary(self, report_id, block, data):
+        summary = self.report_summaries.get(report_id)
+        if summary is None:
+            summary = {
+                "report_id": report_id,
+                "reporter_email": None,
+                "student_id": None,
+                "status": "Submitted",
+                "created_at": block["timestamp"],
+                "sla_deadline": None,
+                "escalated": False,
+                "last_action": None,
+                "last_actor": None,
+                "last_updated": None,
+                "last_index": None,
+                "block_count": 0,
+                "sla_breached": False,
+            }
+            self.report_summaries[report_id] = summary
+            self.report_positions[report_id] = len(self.report_order)
+            self.report_order.append(report_id)
+            self.report_created.append(block["timestamp"])
+            self.reports_by_status.setdefault(summary["status"], set()).add(report_id)
+
+        action_type = block["action_type"]
+        if action_type == "Created":
+            summary["reporter_email"] = data.get("reporter_email")
+            summary["student_id"] = data.get("student_id")
+            summary["sla_deadline"] = block.get("sla_deadline")
+        elif action_type in STATUS_ACTIONS:
+            self.reports_by_status[summary["status"]].discard(report_id)
+            self.reports_by_status.setdefault(action_type, set()).add(report_id)
+            summary["status"] = action_type
+            if action_type == "Escalated to Validator":
+                summary["escalated"] = True
+        elif action_type == SLA_BREACHED:
+            summary["sla_breached"] = True
+
+        self.reports_by_actor.setdefault(block["actor"], set()).add(report_id)
+        summary["last_action"] = action_type
+        summary["last_actor"] = block["actor"]
+        summary["last_updated"] = block["timestamp"]
+        summary["last_index"] = block["index"]
+        summary["block_count"] += 1
+
+    def rebuild_indexes(self):
+        self.users = {}
+        self.report_blocks = {}
+        self.reporter_reports = {}
+        self.report_summaries = {}
+        self.report_order = []
+        self.report_created = []
+        self.report_positions = {}
+        self.reports_by_status = {}
+        self.reports_by_actor = {}
+        for block in self.chain:
+            self.index_block(block)
+
+    # ---------- STORAGE ----------
+
+    def append_block(self, block):
+        """
+        Adds a freshly created block to the chain, its indexes and storage.
+        Returns the block as kept in memory (see wrap_block).
+        """
+        if self.storage_mode == "journal":
+            # Written first so a compact block can refer to its journal record
+            block = self.wrap_block(block, *self.append_journal(block))
+            self.chain.append(block)
+            self.index_block(block)
+        else:
+            self.chain.append(block)
+            self.index_block(block)
+            self.save_chain()
+        return block
+
+    def wrap_block(self, block, offset, size):
+        """
+        In-memory form of a block whose journal record starts at `offset` and is
+        `size` bytes long: a compact Block in compact mode, else the dict itself.
+        """
+        if not self.compact:
+            return block
+        previous = self.chain[-1] if self.chain else None
+        return Block.from_dict(block, self.payloads, offset if size > LAZY_DATA_BYTES else None, previous)
+
     def save_chain(self):
-        with open(CHAIN_FILE, "w") as f:
+        with metrics.CHAIN_OPERATION_SECONDS.time(operation="save_chain"), open(self.chain_file, "w") as f:
             json.dump(self.chain, f, indent=2)
 
     def load_chain(self):
-        if CHAIN_FILE.exists():
-            with open(CHAIN_FILE, "r") as f:
+        with metrics.CHAIN_OPERATION_SECONDS.time(operation="load_chain"):
+            self._load_chain()
+
+    def _load_chain(self):
+        if self.storage_mode == "journal":
+            self.load_journal()  # indexes the blocks itself (or restores them from the snapshot)
+            return
+        if self.chain_file.exists():
+            with open(self.chain_file, "r") as f:
                 self.chain = json.load(f)
         else:
             self.chain = []
+        self.rebuild_indexes()
+
+    def export_chain(self, path=None):
+        """
+        Writes the current chain in the classic chain.json layout
+        (a single indented JSON array), e.g. for tools that still read it.
+        """
+        with self._lock:
+            self.sync()
+            with open(path or self.chain_file, "w") as f:
+                json.dump(self.chain, f, indent=2, default=dict)
+
+    # ---------- JOURNAL ----------
+
+    @contextmanager
+    def journal_lock(self):
+        """
+        Exclusive inter-process lock (flock on chain.jsonl.lock) held while the
+        journal is loaded or appended to. No-op in json mode or without fcntl.
+        Reentrant: nested uses (e.g. refresh() inside create_block) keep the
+        outer flock instead of releasing it on the way out.
+        """
+        if self.storage_mode != "journal" or fcntl is None:
+            yield
+            return
+        with self._lock:
+            # flock is per open file, and descriptors are shared across fork(): reopen per process
+            if self._lock_file is None or self._lock_file_pid != os.getpid():
+                self._lock_file = open(f"{self.journal_file}.lock", "a")
+                self._lock_file_pid = os.getpid()
+                self._lock_file_depth = 0
+            if self._lock_file_depth == 0:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._lock_file_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_file_depth -= 1
+                if self._lock_file_depth == 0:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """
+        Applies blocks that other processes appended to the journal since this
+        process last read it, reading only the new tail. Cheap (one stat) when
+        nothing changed. Returns the number of new blocks. Tail reads need no
+        lock, but a full reload takes journal_lock(): load_journal() truncates a
+        partial last record, which is only torn if nobody is mid-append.
+        """
+        if self.storage_mode != "journal":
+            return 0
+        with self._lock:
+            try:
+                size = os.stat(self.journal_file).st_size
+            except FileNotFoundError:
+                return 0
+            if size == self._journal_offset:
+                return 0
+            if size < self._journal_offset:
+                # Journal was replaced (e.g. restored from backup): start over.
+                with self.journal_lock():
+                    self.load_chain()
+                return len(self.chain)
+
+            with open(self.journal_file, "rb") as f:
+                f.seek(self._journal_offset)
+                tail = f.read(size - self._journal_offset)
+            # Only complete lines; a writer may be mid-line right now
+            end = tail.rfind(b"\n") + 1
+            lines = tail[:end].splitlines(keepends=True)
+            if lines and json.loads(lines[0])["index"] != len(self.chain):
+                with self.journal_lock():
+                    self.load_chain()
+                return len(lines)
+
+            new_blocks = []
+            for line in lines:
+                block = self.wrap_block(json.loads(line), self._journal_offset, len(line))
+                self._journal_offset += len(line)
+                self.chain.append(block)
+                self.index_block(block)
+                new_blocks.append(block)
+            for block in new_blocks:
+                self.notify_listeners(block)
+            return len(new_blocks)
+
+    def discard_torn_tail(self):
+        """
+        Under journal_lock() nobody else is writing, so bytes past the last complete
+        record can only be a write interrupted by a crash: cut them off before appending.
+        """
+        if self.storage_mode != "journal" or not self.journal_file.exists():
+            return
+        if self.journal_file.stat().st_size > self._journal_offset:
+            print(f"WARNING: Discarding torn record at end of {self.journal_file.name} (offset {self._journal_offset}).")
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(self._journal_offset)
+
+    def load_journal(self):
+        """
+        Rebuilds the chain and indexes from the latest usable snapshot plus the
+        journal records after it, streamed line by line (the whole journal if
+        there is no snapshot). A torn last line (crash mid-write) is dropped and
+        truncated away so the next append starts on a clean line. Called under journal_lock().
+        """
+        self.chain = []
+        self._journal_offset = 0
+        if self.payloads is not None:
+            self.payloads.reset()
+        if not self.journal_file.exists():
+            # First start in journal mode: import an existing chain.json once.
+            if self.chain_file.exists():
+                with open(self.chain_file, "r") as f:
+                    imported = json.load(f)
+                for block in imported:
+                    self.chain.append(self.wrap_block(block, *self.append_journal(block, sync=False)))
+                self.sync()
+            self.rebuild_indexes()
+            return
+
+        snapshot = chain_snapshot.read_snapshot(self.snapshot_file, self.journal_file, self.hash, self.compact)
+        if snapshot is not None:
+            blocks, indexes, self._journal_offset = snapshot
+            self.chain = [Block.from_state(state, self.payloads) for state in blocks] if self.compact else blocks
+            for attr, value in indexes.items():
+                setattr(self, attr, value)
+            # Timelines reference the chain's block objects, so they are relinked rather than stored
+            self.report_blocks = {}
+            for block in self.chain:
+                if block.get("report_id") is not None:
+                    self.report_blocks.setdefault(block["report_id"], []).append(block)
+        else:
+            self.rebuild_indexes()
+
+        good_offset = self._journal_offset
+        replayed = 0
+        with open(self.journal_file, "rb") as f:
+            f.seek(good_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    block = self.wrap_block(json.loads(line), good_offset, len(line))
+                except ValueError:
+                    break
+                self.chain.append(block)
+                self.index_block(block)
+                good_offset += len(line)
+                replayed += 1
+
+        if good_offset != self.journal_file.stat().st_size:
+            print(f"WARNING: Discarding torn record at end of {self.journal_file.name} (offset {good_offset}).")
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(good_offset)
+        self._journal_offset = good_offset
+
+        if self.snapshot_every and replayed >= self.snapshot_every:
+            self.save_snapshot()
+
+    def save_snapshot(self):
+        """
+        Writes chain.snapshot covering everything applied so far (see chain_snapshot).
+        Holds this process's lock only while copying the indexes, never the journal
+        lock; encoding and writing run unlocked.
+        """
+        with metrics.CHAIN_OPERATION_SECONDS.time(operation="save_snapshot"):
+            with self._lock:
+                if not self.chain:
+                    return
+                captured = chain_snapshot.capture_snapshot(self)
+            chain_snapshot.write_snapshot(chain_snapshot.encode_snapshot(captured), self.snapshot_file)
+
+    def save_snapshot_in_background(self):
+        """
+        Starts save_snapshot on a thread unless one is already running, so the
+        request appending block N doesn't wait for (or hold the journal lock during) it.
+        """
+        with self._lock:
+            if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+                return
+            self._snapshot_thread = threading.Thread(target=self._save_snapshot_logged, name="chain-snapshot", daemon=True)
+            self._snapshot_thread.start()
+
+    def _save_snapshot_logged(self):
+        try:
+            self.save_snapshot()
+        except Exception as e:
+            print(f"WARNING: Could not write {self.snapshot_file}: {e}")
+
+    def append_journal(self, block, sync=True):
+        """
+        Appends one record and returns its (offset, size) in the journal.
+        """
+        with metrics.CHAIN_OPERATION_SECONDS.time(operation="append_journal"):
+            return self._append_journal(block, sync)
+
+    def _append_journal(self, block, sync):
+        if self._journal is None or self._journal_pid != os.getpid():
+            if self._journal_pid is None:
+                atexit.register(self.close)
+            self._journal = open(self.journal_file, "ab")
+            self._journal_pid = os.getpid()
+            self._unsynced = 0
+        record = (json.dumps(block, separators=(",", ":")) + "\n").encode()
+        offset = self._journal_offset
+        self._journal.write(record)
+        self._journal.flush()
+        self._journal_offset += len(record)
+        self._unsynced += 1
+
+        if sync and (self._unsynced >= FSYNC_EVERY or time.time() - self._last_fsync >= FSYNC_INTERVAL):
+            self.sync()
+        elif sync:
+            self._schedule_fsync()
+        return offset, len(record)
+
+    def _schedule_fsync(self):
+        # Timers don't survive fork, so a timer armed by another pid doesn't count
+        timer = self._fsync_timer
+        if timer is not None and timer.is_alive() and timer.pid == os.getpid():
+            return
+        timer = threading.Timer(FSYNC_INTERVAL, self._timed_sync)
+        timer.name = "chain-fsync"
+        timer.daemon = True
+        timer.pid = os.getpid()
+        self._fsync_timer = timer
+        timer.start()
+
+    def _timed_sync(self):
+        with self._lock:
+            if self._journal_pid == os.getpid():
+                self.sync()
+
+    def sync(self):
+        """
+        Forces pending journal writes to disk.
+        """
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.time()
+
+    def close(self):
+        if self._fsync_timer is not None:
+            self._fsync_timer.cancel()  # the sync below covers it
+        snapshot_thread = self._snapshot_thread
+        if snapshot_thread is not None and snapshot_thread.is_alive():
+            snapshot_thread.join()  # don't exit halfway through writing the snapshot
+        with self._lock:
+            if self._journal is not None and self._journal_pid == os.getpid():
+                self.sync()
+                self._journal.close()
+                self._journal = None
 
     # ---------- USERS ----------
 
@@ -79,12 +600,7 @@ class Blockchain:
         """
         user_id = the login identifier (we'll use email as user_id in frontend)
         """
-        for block in reversed(self.chain):
-            if block["action_type"] == "Register":
-                data = block.get("data", {})
-                if data.get("user_id") == user_id:
-                    return data
-        return None
+        return self.users.get(user_id)
 
     # ---------- REPORTS (Reporter/Admin/Validator) ----------
 
@@ -92,39 +608,108 @@ class Blockchain:
         """
         Returns list of timelines. Each timeline = list of blocks for that report.
         """
-        report_ids = set()
-        for block in self.chain:
-            if block["action_type"] == "Created":
-                data = block.get("data", {})
-                if data.get("reporter_email") == reporter_email:
-                    report_ids.add(block["report_id"])
-
-        return [self.get_report_timeline(rid) for rid in report_ids]
+        with self._lock:
+            report_ids = self.reporter_reports.get(reporter_email, [])
+            return [self.get_report_timeline(rid) for rid in report_ids]
 
     def get_all_reports(self):
         """
         Returns dict: report_id -> list of blocks (timeline).
         """
-        reports = {}
-        for block in self.chain:
-            rid = block.get("report_id")
-            if rid is not None:
-                reports.setdefault(rid, []).append(block)
-        return reports
+        with self._lock:
+            return {rid: list(blocks) for rid, blocks in self.report_blocks.items()}
 
     def get_report_timeline(self, report_id):
-        return [b for b in self.chain if b.get("report_id") == report_id]
+        with self._lock:
+            return list(self.report_blocks.get(report_id, []))
 
     def get_escalated_reports(self):
         """
         Returns list of timelines for reports that were escalated to Validator.
         """
         escalated = []
-        for report_id, blocks in self.get_all_reports().items():
-            if any(b["action_type"] == "Escalated to Validator" for b in blocks):
-                escalated.append(blocks)
+        with self._lock:
+            for report_id, blocks in self.report_blocks.items():
+                if any(b["action_type"] == "Escalated to Validator" for b in blocks):
+                    escalated.append(list(blocks))
         return escalated
 
+    def get_report_blocks_since(self, index, reporter_email=None):
+        """
+        Returns (blocks, high_water_mark): report blocks appended after the given
+        chain index, and the index to pass next time. Block indexes only ever grow,
+        so this works as a sync cursor; cost is proportional to the new blocks.
+        User registration blocks are never included.
+        """
+        with self._lock:
+            tail = self.chain[max(index + 1, 0):]
+            high_water_mark = self.chain[-1]["index"]
+            own = set(self.reporter_reports.get(reporter_email, [])) if reporter_email is not None else None
+
+        blocks = [b for b in tail if b.get("report_id") is not None]
+        if own is not None:
+            blocks = [b for b in blocks if b["report_id"] in own]
+        return blocks, high_water_mark
+
+    def get_report_summary(self, report_id):
+        return self.report_summaries.get(report_id)
+
+    def query_reports(self, reporter_email=None, status=None, since=None, until=None,
+                      actor=None, sla=None, cursor=None, limit=None, now=None):
+        """
+        Returns (report_ids, next_cursor) for reports matching all given filters,
+        in creation order, using the summary indexes rather than the chain.
+          status  -> iterable of statuses
+          since/until -> creation time range (unix timestamps, inclusive)
+          actor   -> only reports this actor (Reporter/Admin/Validator/System) acted on
+          sla     -> "overdue" | "on_track" | "closed" | "none"
+          cursor  -> next_cursor of the previous page
+        """
+        # The indexes change under create_block()/refresh() in other threads
+        with self._lock:
+            # Reports are appended in time order, so a date range is a slice of report_order
+            lo = bisect.bisect_left(self.report_created, since) if since is not None else 0
+            hi = bisect.bisect_right(self.report_created, until) if until is not None else len(self.report_order)
+            if cursor is not None:
+                lo = max(lo, cursor + 1)
+
+            candidates = None
+            if reporter_email is not None:
+                candidates = set(self.reporter_reports.get(reporter_email, []))
+            if status:
+                by_status = set().union(*(self.reports_by_status.get(s, set()) for s in status))
+                candidates = by_status if candidates is None else candidates & by_status
+            if actor is not None:
+                by_actor = self.reports_by_actor.get(actor, set())
+                candidates = set(by_actor) if candidates is None else candidates & by_actor
+
+            if candidates is None:
+                positions = range(lo, hi)
+            else:
+                positions = sorted(p for p in map(self.report_positions.get, candidates) if lo <= p < hi)
+
+            now = now if now is not None else time.time()
+            report_ids = []
+            next_cursor = None
+            for position in positions:
+                report_id = self.report_order[position]
+                if sla is not None and self.sla_state(self.report_summaries[report_id], now) != sla:
+                    continue
+                if limit is not None and len(report_ids) >= limit:
+                    next_cursor = self.report_positions[report_ids[-1]]
+                    break
+                report_ids.append(report_id)
+            return report_ids, next_cursor
+
+    @staticmethod
+    def sla_state(summary, now=None):
+        if summary["status"] in CLOSED_STATUSES:
+            return "closed"
+        if summary["sla_deadline"] is None:
+            return "none"
+        now = now if now is not None else time.time()
+        return "overdue" if summary["sla_deadline"] < now else "on_track"
+
     def update_report(self, report_id, action_type, actor, data):
         """
         Adds a new block to the chain representing a status update or comment.
@@ -0,0 +1,190 @@
+# backend/chain_audit.py
+"""
+Chain integrity verification.
+
+Checks that every block's data_hash matches its data, that every
+previous_hash matches the hash of the block before it, and that indexes are
+contiguous. After a successful run a signed checkpoint of the verified prefix
+is saved, so the next audit only verifies blocks appended since then.
+
+Usage:
+    python backend/chain_audit.py [--full] [--workers N]
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import multiprocessing
+import os
+import secrets
+import sys
+import time
+
+try:
+    from backend.blockchain_module import DATA_DIR, Blockchain
+except ImportError:
+    from blockchain_module import DATA_DIR, Blockchain
+
+
+# Kept next to the chain files (CHAIN_DATA_DIR), since a checkpoint only means
+# something for the chain it was taken of
+CHECKPOINT_FILE = DATA_DIR / "chain_checkpoint.json"
+AUDIT_KEY_FILE = DATA_DIR / ".audit_key"
+
+# Full re-verification is split across a process pool in chunks of this many blocks
+CHUNK_SIZE = 50000
+MAX_REPORTED_ERRORS = 20
+
+# Chain shared with forked pool workers (avoids pickling millions of blocks)
+_audit_chain = None
+
+
+# ---------- CHECKPOINTS ----------
+
+def audit_key():
+    """
+    HMAC key for checkpoints: CHAIN_AUDIT_KEY, or a random key generated once
+    into CHAIN_DATA_DIR/.audit_key (readable by the service user only).
+    """
+    key = os.environ.get('CHAIN_AUDIT_KEY')
+    if key:
+        return key.encode()
+    if not AUDIT_KEY_FILE.exists():
+        fd = os.open(AUDIT_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    return AUDIT_KEY_FILE.read_text().strip().encode()
+
+
+def sign_checkpoint(index, block_hash, key):
+    return hmac.new(key, f"{index}:{block_hash}".encode(), hashlib.sha256).hexdigest()
+
+
+def load_checkpoint(blockchain, checkpoint_file=CHECKPOINT_FILE):
+    """
+    Returns the last verified index if the checkpoint is authentic and still
+    matches the chain, else None (forcing a full audit).
+    """
+    try:
+        with open(checkpoint_file, "r") as f:
+            checkpoint = json.load(f)
+        index, block_hash = checkpoint["index"], checkpoint["block_hash"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+    expected = sign_checkpoint(index, block_hash, audit_key())
+    if not hmac.compare_digest(expected, checkpoint.get("signature", "")):
+        print("WARNING: Chain checkpoint signature is invalid; running a full audit.")
+        return None
+    if index >= len(blockchain.chain) or blockchain.hash(blockchain.chain[index]) != block_hash:
+        print("WARNING: Chain no longer matches the checkpoint; running a full audit.")
+        return None
+    return index
+
+
+def save_checkpoint(blockchain, index, checkpoint_file=CHECKPOINT_FILE):
+    # Only called right after [0, index] verified, so the stored block_hash is trustworthy
+    block_hash = blockchain.block_hash(blockchain.chain[index])
+    checkpoint = {
+        "index": index,
+        "block_hash": block_hash,
+        "verified_at": time.time(),
+        "signature": sign_checkpoint(index, block_hash, audit_key()),
+    }
+    tmp_path = f"{checkpoint_file}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, checkpoint_file)
+
+
+# ---------- VERIFICATION ----------
+
+def verify_range(blockchain, start, end):
+    """
+    Verifies blocks [start, end). Returns a list of error strings.
+    """
+    chain = blockchain.chain
+    errors = []
+    # The block before the range is re-hashed by whichever chunk owns it, so
+    # its stored block_hash can be trusted here instead of hashing it twice.
+    previous_hash = blockchain.block_hash(chain[start - 1]) if start > 0 else None
+    for i in range(start, end):
+        block = chain[i]
+        block_hash = blockchain.hash(block)
+        if block["index"] != i:
+            errors.append(f"block {i}: index is {block['index']}")
+        if block["data_hash"] != blockchain.hash_data(block.get("data") or {}):
+            errors.append(f"block {i}: data_hash does not match data")
+        if block.get("block_hash", block_hash) != block_hash:
+            errors.append(f"block {i}: stored block_hash does not match its content")
+        if i == 0:
+            if block["previous_hash"] != "0":
+                errors.append("block 0: genesis previous_hash is not '0'")
+        elif block["previous_hash"] != previous_hash:
+            errors.append(f"block {i}: previous_hash does not match block {i - 1}")
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+        previous_hash = block_hash
+    return errors
+
+
+def _verify_chunk(bounds):
+    return verify_range(_audit_chain, *bounds)
+
+
+def verify_chain(blockchain, full=False, workers=None, checkpoint_file=CHECKPOINT_FILE):
+    """
+    Verifies the chain and returns a report dict:
+      {"ok", "verified_from", "verified_to", "blocks_checked", "seconds", "errors"}
+    Unless full=True, verification starts after the last signed checkpoint.
+    Large ranges are split across `workers` processes (default: CPU count).
+    """
+    global _audit_chain
+    started = time.perf_counter()
+    blockchain.refresh()
+    tip = len(blockchain.chain) - 1
+
+    checkpoint = None if full else load_checkpoint(blockchain, checkpoint_file)
+    start = 0 if checkpoint is None else checkpoint + 1
+
+    workers = workers or os.cpu_count() or 1
+    bounds = [(lo, min(lo + CHUNK_SIZE, tip + 1)) for lo in range(start, tip + 1, CHUNK_SIZE)]
+    can_fork = "fork" in multiprocessing.get_all_start_methods()
+
+    if workers > 1 and len(bounds) > 1 and can_fork:
+        _audit_chain = blockchain
+        try:
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                chunk_errors = pool.map(_verify_chunk, bounds)
+        finally:
+            _audit_chain = None
+    else:
+        chunk_errors = [verify_range(blockchain, lo, hi) for lo, hi in bounds]
+
+    errors = [error for chunk in chunk_errors for error in chunk][:MAX_REPORTED_ERRORS]
+    if not errors and tip >= 0:
+        save_checkpoint(blockchain, tip, checkpoint_file)
+
+    return {
+        "ok": not errors,
+        "verified_from": start,
+        "verified_to": tip,
+        "blocks_checked": tip + 1 - start,
+        "seconds": round(time.perf_counter() - started, 3),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify blockchain integrity.")
+    parser.add_argument("--full", action="store_true", help="ignore the checkpoint and re-verify every block")
+    parser.add_argument("--workers", type=int, default=None, help="processes for large audits (default: CPU count)")
+    args = parser.parse_args()
+
+    report = verify_chain(Blockchain(), full=args.full, workers=args.workers)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# backend/chain_snapshot.py
+"""
+Binary snapshots of a journal-mode chain, so a process can start without
+re-parsing every line of chain.jsonl and rebuilding the indexes from scratch.
+
+File layout:
+    MAGIC (8 bytes) | header length (4 bytes, big-endian) | header (JSON) | body (marshal)
+
+The body is marshal.dumps((chain, indexes)), with compact blocks stored as
+plain tuples (Block.state). marshal keeps shared objects shared (e.g. the
+data dicts also held by the users index), but its format is only stable
+within one Python version, so the header records the version and a
+mismatching snapshot is ignored. report_blocks only holds references to
+chain blocks and is relinked on load instead of stored. The header also records the journal
+offset the snapshot covers and the hash of the block just before it; startup
+only trusts the snapshot if the journal still has that block at that offset,
+then replays the journal tail.
+"""
+import json
+import marshal
+import os
+import struct
+import sys
+
+MAGIC = b"BDSNAP\x00\x01"
+FORMAT_VERSION = 3
+HEADER_LENGTH = struct.Struct(">I")
+
+# Blockchain attributes stored alongside the chain (see Blockchain.rebuild_indexes)
+INDEX_ATTRS = (
+    "users", "reporter_reports", "report_summaries", "report_order",
+    "report_created", "report_positions", "reports_by_status", "reports_by_actor",
+)
+# Indexes whose values are never modified in place (users holds the Register
+# blocks' data dicts, shared with the chain), so a shallow copy is enough
+SHARED_INDEX_ATTRS = ("users", "report_positions")
+
+
+def _runtime():
+    return f"{sys.implementation.name}-{sys.version_info[0]}.{sys.version_info[1]}-marshal{marshal.version}"
+
+
+def capture_snapshot(blockchain):
+    """
+    Copies what a snapshot needs at the journal offset already applied. Call with
+    blockchain._lock held so chain, indexes and offset agree. Blocks are only ever
+    appended, so the chain is captured as (list, length); the indexes are updated
+    in place and are copied one level down (summaries, sets, lists), which is far
+    cheaper than encoding them. Pass the result to encode_snapshot() after
+    releasing the lock.
+    """
+    indexes = {}
+    for attr in INDEX_ATTRS:
+        index = getattr(blockchain, attr)
+        if isinstance(index, list):
+            indexes[attr] = list(index)
+        elif attr in SHARED_INDEX_ATTRS:
+            indexes[attr] = dict(index)
+        else:
+            indexes[attr] = {key: value.copy() for key, value in index.items()}
+    tip = blockchain.chain[-1]
+    return {
+        "chain": blockchain.chain,
+        "length": len(blockchain.chain),
+        "compact": blockchain.compact,
+        "journal_offset": blockchain._journal_offset,
+        "tip_index": tip["index"],
+        "tip_hash": blockchain.block_hash(tip),
+        "indexes": indexes,
+    }
+
+
+def encode_snapshot(captured):
+    """
+    Serializes a capture_snapshot() result; needs no lock.
+    """
+    chain = captured["chain"][:captured["length"]]
+    blocks = [block.state() for block in chain] if captured["compact"] else chain
+    body = marshal.dumps((blocks, captured["indexes"]))
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "runtime": _runtime(),
+        "compact": captured["compact"],
+        "journal_offset": captured["journal_offset"],
+        "tip_index": captured["tip_index"],
+        "tip_hash": captured["tip_hash"],
+        "body_size": len(body),
+    }).encode()
+    return MAGIC + HEADER_LENGTH.pack(len(header)) + header + body
+
+
+def write_snapshot(data, path):
+    """
+    Atomically replaces the snapshot at `path` with encoded snapshot bytes.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def read_snapshot(path, journal_file, hash_block, compact=False):
+    """
+    Returns (blocks, indexes, journal_offset) if the snapshot at `path` is intact,
+    was written by this Python version in the same block representation and is
+    a prefix of `journal_file`; else None. Compact blocks come back as state tuples.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (header_size,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+            header = json.loads(f.read(header_size))
+            body_start = f.tell()
+            if header.get("format") != FORMAT_VERSION or header.get("runtime") != _runtime():
+                return None
+            if header.get("compact") != compact:
+                return None
+            if os.fstat(f.fileno()).st_size != body_start + header["body_size"]:
+                return None
+            offset = header["journal_offset"]
+            if record_before(journal_file, offset, hash_block) != (header["tip_index"], header["tip_hash"]):
+                print(f"WARNING: {os.path.basename(path)} does not match the journal; loading it in full.")
+                return None
+            chain, indexes = marshal.loads(f.read())
+    except (OSError, ValueError, KeyError, EOFError, TypeError, struct.error):
+        return None
+
+    if len(chain) != header["tip_index"] + 1 or set(indexes) != set(INDEX_ATTRS):
+        return None
+    return chain, indexes, offset
+
+
+def record_before(journal_file, offset, hash_block, chunk_size=65536):
+    """
+    Returns (index, hash) of the journal record that ends exactly at `offset`, or None.
+    """
+    if offset <= 0:
+        return None
+    with open(journal_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size < offset:
+            return None
+        # Scan backwards from the record's trailing newline to the one before it
+        start = offset - 1
+        data = b""
+        while True:
+            read_from = max(0, start - chunk_size)
+            f.seek(read_from)
+            data = f.read(start - read_from) + data
+            start = read_from
+            newline = data.rfind(b"\n")
+            if newline >= 0 or start == 0:
+                break
+        f.seek(offset - 1)
+        if f.read(1) != b"\n":
+            return None
+    try:
+        block = json.loads(data[newline + 1:])
+    except ValueError:
+        return None
+    return block["index"], hash_block(block)
+
+
+def main():
+    """
+    python backend/chain_snapshot.py  -> writes a snapshot of the current journal now.
+    """
+    try:
+        from backend.blockchain_module import Blockchain
+    except ImportError:
+        from blockchain_module import Blockchain
+
+    blockchain = Blockchain(storage_mode="journal")
+    blockchain.save_snapshot()
+    print(f"Wrote snapshot of {len(blockchain.chain)} blocks to {blockchain.snapshot_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# backend/compact_block.py
+"""
+Memory-compact blocks for large journal-mode chains (CHAIN_COMPACT_BLOCKS=true).
+
+A Block is a Mapping with __slots__ instead of a dict per block: action
+types, actors and report ids are interned, previous_hash shares the previous
+block's block_hash string, the key order is a tuple shared by all blocks of
+the same shape, and a data payload whose journal record is larger than
+LAZY_DATA_BYTES is dropped once the block is indexed and read back from
+chain.jsonl by offset when accessed. Code written against dict blocks
+(block["actor"], block.get("data"), json with default=dict) keeps working.
+"""
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+
+# Journal records larger than this keep their data on disk only
+LAZY_DATA_BYTES = int(os.environ.get('CHAIN_LAZY_DATA_BYTES', '1024'))
+# Recently read payloads kept in memory (listings re-read the same reports)
+PAYLOAD_CACHE_SIZE = int(os.environ.get('CHAIN_PAYLOAD_CACHE_SIZE', '1024'))
+
+FIELDS = (
+    "index", "timestamp", "action_type", "report_id", "actor",
+    "data_hash", "previous_hash", "sla_deadline", "block_hash",
+)
+_FIELD_SET = frozenset(FIELDS)
+_INTERNED = ("action_type", "actor", "report_id")
+
+# One key-order tuple per distinct block shape, shared by every block of that shape
+_key_orders = {}
+
+
+def _shared_keys(keys):
+    return _key_orders.setdefault(keys, keys)
+
+
+class PayloadStore:
+    """
+    Reads the data of lazily loaded blocks back from the journal, with a small LRU.
+    """
+
+    def __init__(self, journal_file, cache_size=PAYLOAD_CACHE_SIZE):
+        self.journal_file = journal_file
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_pid = None
+
+    def load(self, offset):
+        with self._lock:
+            data = self._cache.get(offset)
+            if data is not None:
+                self._cache.move_to_end(offset)
+                return data
+            if self._file is None or self._file_pid != os.getpid():
+                self._file = open(self.journal_file, "rb")
+                self._file_pid = os.getpid()
+            self._file.seek(offset)
+            data = json.loads(self._file.readline())["data"]
+            self._cache[offset] = data
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return data
+
+    def reset(self):
+        """
+        Forgets cached payloads and the open handle (the journal was reloaded or replaced).
+        """
+        with self._lock:
+            self._cache.clear()
+            self._file = None
+
+
+class Block(Mapping):
+    __slots__ = FIELDS + ("_keys", "_data", "_offset", "_store", "_extra")
+
+    @classmethod
+    def from_dict(cls, block, store, offset=None, previous=None):
+        """
+        offset: journal offset of the block's record if its data may be released
+        to disk after indexing (see release_payload), else None.
+        previous: the block before it, whose block_hash string is reused.
+        """
+        self = cls.__new__(cls)
+        self._keys = _shared_keys(tuple(block))
+        for field in FIELDS:
+            setattr(self, field, block.get(field))
+        for field in _INTERNED:
+            value = getattr(self, field)
+            if type(value) is str:
+                setattr(self, field, sys.intern(value))
+        if previous is not None and previous.get("block_hash") == self.previous_hash:
+            self.previous_hash = previous.get("block_hash")
+        self._data = block.get("data")
+        self._offset = offset
+        self._store = store
+        extra = {key: block[key] for key in self._keys if key not in _FIELD_SET and key != "data"}
+        self._extra = extra or None
+        return self
+
+    def state(self):
+        """
+        Plain tuple form for chain snapshots (marshal cannot encode objects).
+        """
+        return tuple(getattr(self, field) for field in FIELDS) + (self._keys, self._data, self._offset, self._extra)
+
+    @classmethod
+    def from_state(cls, state, store):
+        self = cls.__new__(cls)
+        for field, value in zip(FIELDS, state):
+            setattr(self, field, value)
+        self._keys, self._data, self._offset, self._extra = state[len(FIELDS):]
+        self._store = store
+        return self
+
+    def release_payload(self):
+        # Only blocks created with an offset (large records) give their data back
+        if self._offset is not None:
+            self._data = None
+
+    def payload(self):
+        if self._data is None and self._offset is not None:
+            return self._store.load(self._offset)
+        return self._data
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        if key == "data":
+            return self.payload()
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        # Used to cache block_hash on blocks from older chains
+        if key not in self._keys:
+            self._keys = _shared_keys(self._keys + (key,))
+        if key == "data":
+            self._data, self._offset = value, None
+        elif key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            self._extra = dict(self._extra or {}, **{key: value})
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"Block({dict(self)!r})"
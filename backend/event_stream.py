@@ -0,0 +1,77 @@
+# backend/event_stream.py
+import os
+import queue
+import threading
+
+
+# Heartbeat comment interval, so proxies and the browser keep the stream open
+HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', '15'))
+# Streams are closed after this long; EventSource reconnects with Last-Event-ID,
+# so a thread is never pinned by an idle client forever. Keep it well below
+# GUNICORN_TIMEOUT (120).
+MAX_STREAM_SECONDS = float(os.environ.get('SSE_MAX_STREAM_SECONDS', '60'))
+# Concurrent streams per process; beyond this /events answers 503 and dashboards keep polling
+MAX_SUBSCRIBERS = int(os.environ.get('SSE_MAX_SUBSCRIBERS', '50'))
+# Blocks buffered per subscriber before it is considered too slow and dropped
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+DROPPED = None  # sentinel pushed to a subscriber that fell behind
+
+
+class BlockBroadcaster:
+    """
+    Fans out newly appended blocks to every open /events stream. Publishing
+    never blocks: each subscriber has a bounded queue, and a subscriber that
+    falls behind is dropped (it reconnects and catches up from the chain).
+    """
+
+    def __init__(self, max_subscribers=MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """
+        Returns a queue receiving published blocks, or None if the process is at capacity.
+        """
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, block):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(block)
+            except queue.Full:
+                self.unsubscribe(subscriber)
+                _drain(subscriber)
+                subscriber.put_nowait(DROPPED)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+def _drain(subscriber):
+    try:
+        while True:
+            subscriber.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def format_event(block, dumps):
+    """
+    One SSE message per block; the chain index is the event id, so a reconnecting
+    client's Last-Event-ID is exactly the sync cursor.
+    """
+    return f"id: {block['index']}\nevent: block\ndata: {dumps(block)}\n\n"
@@ -0,0 +1,141 @@
+# backend/evidence_store.py
+import hashlib
+import io
+import os
+import re
+import uuid
+from pathlib import Path
+
+
+CHUNK_SIZE = 1024 * 1024
+# Images up to this size are also kept in memory so they can be handed to the classifier directly
+IMAGE_BUFFER_LIMIT = 16 * 1024 * 1024
+
+# Stored names look like "ab/cd/abcd...(64 hex).jpg"
+STORED_NAME = re.compile(r"^([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})(\.[a-z0-9]{1,10})?$")
+
+
+class StoredEvidence:
+    def __init__(self, name, sha256, size, image_bytes, deduplicated):
+        self.name = name                  # path relative to the store root, referenced from report blocks
+        self.sha256 = sha256
+        self.size = size
+        self.image_bytes = image_bytes    # raw bytes for small images, else None
+        self.deduplicated = deduplicated  # True if identical content was already stored
+
+
+class Upload:
+    """
+    Writable temp file for one uploaded file, in the store's tmp dir. Data is
+    hashed (and small images buffered) as it is written, so the store only has
+    to rename the file once it is complete. Reads and seeks go to the file.
+    """
+
+    def __init__(self, path, keep_image):
+        self.path = path
+        self._file = open(path, "w+b")
+        self._digest = hashlib.sha256()
+        self._size = 0
+        self._buffer = io.BytesIO() if keep_image else None
+
+    def write(self, data):
+        self._file.write(data)
+        self._digest.update(data)
+        self._size += len(data)
+        if self._buffer is not None:
+            if self._size > IMAGE_BUFFER_LIMIT:
+                self._buffer = None
+            else:
+                self._buffer.write(data)
+        return len(data)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def finish(self):
+        """
+        Closes the file; returns (sha256, size, image bytes or None).
+        """
+        self._file.close()
+        image_bytes = self._buffer.getvalue() if self._buffer is not None else None
+        return self._digest.hexdigest(), self._size, image_bytes
+
+    def close(self):
+        # Removes the temp file unless the store already moved it into place
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class EvidenceStore:
+    """
+    Content-addressed evidence storage: each distinct file is stored once as
+    <root>/<h[0:2]>/<h[2:4]>/<sha256><ext>, so identical uploads share one copy
+    and no directory grows unbounded.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def open_upload(self, content_type):
+        """
+        A new Upload in this store's tmp dir. Used as the request's file stream
+        factory, so multipart file parts are written here while the body is parsed.
+        """
+        keep_image = (content_type or "").startswith("image/")
+        return Upload(self.tmp_dir / f"{uuid.uuid4().hex}.part", keep_image)
+
+    def save(self, file_storage, filename):
+        """
+        Moves an uploaded file into the store. Files parsed into an Upload of this
+        store are already written and hashed, so they are just renamed; any other
+        stream is copied in chunks first.
+        """
+        upload = file_storage.stream
+        if not (isinstance(upload, Upload) and Path(upload.path).parent == self.tmp_dir):
+            upload = self.open_upload(file_storage.mimetype)
+            try:
+                for chunk in iter(lambda: file_storage.stream.read(CHUNK_SIZE), b""):
+                    upload.write(chunk)
+            except BaseException:
+                upload.close()
+                raise
+
+        try:
+            sha256, size, image_bytes = upload.finish()
+            name = self.name_for(sha256, filename)
+            final_path = self.root / name
+            deduplicated = final_path.exists()
+            if not deduplicated:
+                final_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(upload.path, final_path)
+        finally:
+            upload.close()
+
+        return StoredEvidence(name, sha256, size, image_bytes, deduplicated)
+
+    @staticmethod
+    def name_for(sha256, filename):
+        # Keep the extension so the file is served with the right mimetype
+        ext = os.path.splitext(filename or "")[1].lower()
+        if not re.fullmatch(r"\.[a-z0-9]{1,10}", ext):
+            ext = ""
+        return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+    def path_for(self, name):
+        return str(self.root / name)
+
+    @staticmethod
+    def content_hash(name):
+        """
+        Returns the SHA-256 encoded in a stored name, or None for legacy
+        "{report_id}_{filename}" uploads.
+        """
+        match = STORED_NAME.match(name)
+        if not match or match.group(3)[:4] != match.group(1) + match.group(2):
+            return None
+        return match.group(3)
@@ -0,0 +1,150 @@
+# backend/inference_worker.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    from backend import metrics
+    from backend.ai_module import analyze_texts, analyze_images
+except ImportError:
+    import metrics
+    from ai_module import analyze_texts, analyze_images
+
+
+# Micro-batching knobs. An idle worker runs a lone report straight away; a batch
+# is whatever queued up meanwhile (e.g. during the previous batch). Only when
+# several items of one kind are already waiting, i.e. requests are arriving
+# concurrently, does the worker wait up to AI_MAX_WAIT_MS more for the batch to
+# fill. Batches only form across requests served concurrently by the same
+# process, i.e. with threaded workers (gunicorn.conf.py runs gthread) or backend.asgi.
+MAX_BATCH_SIZE = int(os.environ.get('AI_MAX_BATCH_SIZE', '16'))
+MAX_WAIT_MS = float(os.environ.get('AI_MAX_WAIT_MS', '10'))
+
+
+class InferenceWorker:
+    """
+    Background thread that collects pending text/image analyses from
+    concurrent requests and runs each model pipeline once per micro-batch.
+    """
+
+    def __init__(self, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    # ---------- PUBLIC API ----------
+
+    def submit_text(self, text) -> Future:
+        return self._submit("text", text)
+
+    def submit_image(self, image_path) -> Future:
+        return self._submit("image", image_path)
+
+    def analyze(self, text, image_path, timeout=None):
+        """
+        Convenience wrapper: queues both analyses and waits for the results.
+        """
+        text_future = self.submit_text(text)
+        image_future = self.submit_image(image_path)
+        return text_future.result(timeout), image_future.result(timeout)
+
+    def analyze_async(self, text, image_path, callback):
+        """
+        Queues both analyses and returns immediately; callback(ai_text, ai_image)
+        is invoked from the worker thread once both results are available.
+        """
+        text_future = self.submit_text(text)
+        image_future = self.submit_image(image_path)
+        remaining = [2]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            try:
+                callback(_result_or_error(text_future), _result_or_error(image_future))
+            except Exception as e:
+                print(f"Error recording AI results: {e}")
+
+        text_future.add_done_callback(on_done)
+        image_future.add_done_callback(on_done)
+
+    # ---------- WORKER ----------
+
+    def _submit(self, kind, payload):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((kind, payload, future))
+        return future
+
+    def _ensure_started(self):
+        # Threads do not survive fork(), so (re)start lazily in each gunicorn worker.
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="inference-worker", daemon=True)
+            self._thread.start()
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        # Take what is already queued without waiting
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        # One report queues one text and one image item; more than one of a kind means load
+        kinds = [item[0] for item in batch]
+        if kinds.count("text") < 2 and kinds.count("image") < 2:
+            return batch
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            texts = [item for item in batch if item[0] == "text"]
+            images = [item for item in batch if item[0] == "image"]
+            if texts:
+                self._run_pipeline(analyze_texts, texts)
+            if images:
+                self._run_pipeline(analyze_images, images)
+
+    def _run_pipeline(self, analyze_batch, items):
+        model = items[0][0]
+        metrics.INFERENCE_BATCH_SIZE.observe(len(items), model=model)
+        try:
+            with metrics.INFERENCE_SECONDS.time(model=model):
+                results = analyze_batch([payload for _, payload, _ in items])
+        except Exception as e:
+            for _, _, future in items:
+                future.set_exception(e)
+            return
+        for (_, _, future), result in zip(items, results):
+            future.set_result(result)
+
+
+def _result_or_error(future):
+    error = future.exception()
+    if error is not None:
+        return f"Error during analysis: {str(error)}"
+    return future.result()
@@ -0,0 +1,100 @@
+# backend/password_hasher.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+# werkzeug hash method, e.g. "scrypt" (werkzeug's default), "scrypt:16384:8:1" or
+# "pbkdf2:sha256:600000". Stored hashes made with other parameters are upgraded on login.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+# Threads doing password hashing per process (hashlib releases the GIL while hashing)
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+# Hashes queued or running per process before /register and /login answer 503
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', '32'))
+
+
+class HasherBusy(Exception):
+    """
+    Raised when the hashing queue is full; the caller should retry later.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs the deliberately slow password hashing on a small dedicated thread pool
+    with a bounded queue, so a burst of registrations can only use
+    PASSWORD_HASH_WORKERS cores and is shed with HasherBusy instead of starving
+    the request workers.
+    """
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_QUEUE):
+        self.method = method
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._method_prefix = None
+
+    # ---------- PUBLIC API ----------
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def hash_async(self, password, callback):
+        """
+        Queues a hash without waiting; callback(password_hash) runs on the pool.
+        Raises HasherBusy if the queue is full.
+        """
+        future = self._submit(generate_password_hash, password, self.method)
+
+        def on_done(done):
+            if done.exception() is None:
+                try:
+                    callback(done.result())
+                except Exception as e:
+                    print(f"Error in password hash callback: {e}")
+
+        future.add_done_callback(on_done)
+
+    def needs_rehash(self, password_hash):
+        """
+        True if a stored hash was made with a different method or cost parameters.
+        """
+        return password_hash.split("$", 1)[0] != self.method_prefix()
+
+    def method_prefix(self):
+        # werkzeug expands defaults ("scrypt" -> "scrypt:32768:8:1"), so learn the
+        # canonical prefix from one real hash instead of parsing method strings.
+        if self._method_prefix is None:
+            self._method_prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        return self._method_prefix
+
+    # ---------- POOL ----------
+
+    def _run(self, fn, *args):
+        return self._submit(fn, *args).result()
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HasherBusy()
+            # Threads don't survive fork(): each gunicorn worker gets its own pool
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+                self._pid = os.getpid()
+                self._pending = 0
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _):
+        with self._lock:
+            self._pending -= 1
@@ -0,0 +1,141 @@
+# backend/request_profiler.py
+import cProfile
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+
+# Fraction of requests to profile when no control file exists (0 = off)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+# Written by POST /debug/profiling; every worker re-reads it, so the rate changes without a restart
+PROFILE_CONTROL_FILE = Path(os.environ.get('PROFILE_CONTROL_FILE', Path(__file__).parent / "profiling.json"))
+# Where the .prof dumps go, and how many are kept (oldest are deleted first)
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', Path(__file__).parent / "profiles"))
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '200'))
+CONTROL_CHECK_SECONDS = 1.0
+
+
+class RequestProfiler:
+    """
+    Runs cProfile on a random sample of requests and writes one pstats dump per
+    profiled request (open with `python -m pstats`, snakeviz, or flameprof for a
+    flame graph). At most one request per process is profiled at a time, since
+    cProfile can only have one active profiler; requests sampled meanwhile are
+    simply not profiled.
+    """
+
+    def __init__(self, sample_rate=PROFILE_SAMPLE_RATE, control_file=PROFILE_CONTROL_FILE,
+                 output_dir=PROFILE_DIR, max_files=PROFILE_MAX_FILES):
+        self.default_rate = sample_rate
+        self.control_file = Path(control_file)
+        self.output_dir = Path(output_dir)
+        self.max_files = max_files
+        self._rate = sample_rate
+        self._control_mtime = None
+        self._checked_at = 0.0
+        self._busy = threading.Lock()
+        self._local = threading.local()
+
+    # ---------- SAMPLE RATE ----------
+
+    def sample_rate(self):
+        now = time.monotonic()
+        if now - self._checked_at >= CONTROL_CHECK_SECONDS:
+            self._checked_at = now
+            self._reload_control()
+        return self._rate
+
+    def set_sample_rate(self, rate):
+        """
+        Sets the rate for every process sharing the control file; None reverts to
+        PROFILE_SAMPLE_RATE.
+        """
+        if rate is None:
+            try:
+                self.control_file.unlink()
+            except FileNotFoundError:
+                pass
+        else:
+            tmp = self.control_file.with_name(f"{self.control_file.name}.{os.getpid()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump({"sample_rate": rate}, f)
+            os.replace(tmp, self.control_file)
+        self._checked_at = 0.0
+        return self.sample_rate()
+
+    def _reload_control(self):
+        try:
+            mtime = self.control_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._control_mtime = None
+            self._rate = self.default_rate
+            return
+        if mtime == self._control_mtime:
+            return
+        try:
+            with open(self.control_file) as f:
+                self._rate = float(json.load(f)["sample_rate"])
+            self._control_mtime = mtime
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"WARNING: Ignoring profiling control file {self.control_file}: {e}")
+
+    # ---------- PROFILING ----------
+
+    def start(self):
+        """
+        Call at the start of a request; profiles it with probability sample_rate().
+        """
+        rate = self.sample_rate()
+        if rate <= 0 or random.random() >= rate:
+            return
+        if not self._busy.acquire(blocking=False):
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler (e.g. a debugger) is active
+            self._busy.release()
+            return
+        self._local.active = (profile, time.perf_counter())
+
+    def stop(self, name):
+        """
+        Call at the end of the same request. Returns the dump path, or None if
+        the request wasn't profiled.
+        """
+        active = getattr(self._local, "active", None)
+        if active is None:
+            return None
+        self._local.active = None
+        profile, started = active
+        try:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "request"
+            path = self.output_dir / f"{time.time():.3f}-{os.getpid()}-{safe_name}-{elapsed_ms:.0f}ms.prof"
+            profile.dump_stats(path)
+            self._prune()
+            return path
+        except OSError as e:
+            print(f"WARNING: Could not write profile: {e}")
+            return None
+        finally:
+            self._busy.release()
+
+    def recent_profiles(self, limit=20):
+        if not self.output_dir.exists():
+            return []
+        return sorted((p.name for p in self.output_dir.glob("*.prof")), reverse=True)[:limit]
+
+    def _prune(self):
+        profiles = sorted(self.output_dir.glob("*.prof"))
+        for old in profiles[:max(0, len(profiles) - self.max_files)]:
+            try:
+                old.unlink()
+            except FileNotFoundError:
+                pass  # another worker pruned it first
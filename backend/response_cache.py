@@ -0,0 +1,63 @@
+# backend/response_cache.py
+import os
+import threading
+from collections import OrderedDict
+
+
+# Serialized report listings kept per (role, reporter, filter, chain tip)
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '256'))
+# Total bytes of cached bodies, and the largest single body worth caching
+# (a full Admin listing is the whole chain; beyond this it is just rebuilt)
+RESPONSE_CACHE_MB = float(os.environ.get('RESPONSE_CACHE_MB', '64'))
+RESPONSE_CACHE_MAX_ENTRY_MB = float(os.environ.get('RESPONSE_CACHE_MAX_ENTRY_MB', '8'))
+
+
+class ResponseCache:
+    """
+    Small thread-safe LRU of serialized response bodies keyed by ETag, bounded
+    by entry count and total bytes. Each entry records the chain tip it was
+    built for; the first put for a new tip drops the entries of older tips,
+    since they can never be hit again.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, max_bytes=int(RESPONSE_CACHE_MB * 1024 * 1024),
+                 max_entry_bytes=int(RESPONSE_CACHE_MAX_ENTRY_MB * 1024 * 1024)):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.size_bytes = 0
+        self._entries = OrderedDict()  # etag -> (body, tip)
+        self._tip = None
+        self._lock = threading.Lock()
+
+    def get(self, etag):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None:
+                return None
+            self._entries.move_to_end(etag)
+            return entry[0]
+
+    def put(self, etag, body, tip=None):
+        if len(body) > min(self.max_entry_bytes, self.max_bytes):
+            return
+        with self._lock:
+            if tip != self._tip:
+                for key in [key for key, (_, entry_tip) in self._entries.items() if entry_tip != tip]:
+                    self._discard(key)
+                self._tip = tip
+            self._discard(etag)
+            self._entries[etag] = (body, tip)
+            self.size_bytes += len(body)
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def _discard(self, etag):
+        entry = self._entries.pop(etag, None)
+        if entry is not None:
+            self.size_bytes -= len(entry[0])
@@ -0,0 +1,168 @@
+# backend/sla_tracker.py
+import heapq
+import os
+import threading
+import time
+
+try:
+    from backend.blockchain_module import CLOSED_STATUSES, SLA_BREACHED
+except ImportError:
+    from blockchain_module import CLOSED_STATUSES, SLA_BREACHED
+
+
+# Background sweeper that appends an "SLA Breached" block to each overdue report (opt-in)
+SWEEPER_ENABLED = os.environ.get('SLA_SWEEPER', 'false').lower() == 'true'
+SWEEP_SECONDS = float(os.environ.get('SLA_SWEEP_SECONDS', '60'))
+
+
+class SLATracker:
+    """
+    Open reports ordered by SLA deadline, maintained from new blocks (register
+    on_block as a Blockchain listener) instead of scanning timelines.
+
+    Deadlines sit in a min-heap until they pass, then move to the overdue set.
+    Closing a report only drops its bookkeeping entry; its heap entry is skipped
+    when it surfaces (lazy deletion). Each block costs O(log n).
+    """
+
+    def __init__(self, blockchain):
+        self.blockchain = blockchain
+        self._lock = blockchain._lock  # listeners already run under it
+        self._sweeper_pid = None
+        self._rebuild()
+
+    def _rebuild(self):
+        self._heap = []       # (deadline, seq, report_id), including stale entries
+        self._deadlines = {}  # report_id -> (deadline, seq) of its live heap entry
+        self._overdue = {}    # report_id -> deadline, open and past the deadline
+        self._seq = 0
+        self._summaries = self.blockchain.report_summaries
+        for report_id, summary in self._summaries.items():
+            if self._is_open(summary):
+                self._seq += 1
+                self._deadlines[report_id] = (summary["sla_deadline"], self._seq)
+                self._heap.append((summary["sla_deadline"], self._seq, report_id))
+        heapq.heapify(self._heap)
+
+    def _check_rebuilt(self):
+        # A full chain reload (e.g. journal replaced) swaps the index objects without
+        # notifying listeners; start over from the new summaries.
+        if self._summaries is not self.blockchain.report_summaries:
+            self._rebuild()
+
+    @staticmethod
+    def _is_open(summary):
+        return summary["sla_deadline"] is not None and summary["status"] not in CLOSED_STATUSES
+
+    def on_block(self, block):
+        report_id = block.get("report_id")
+        if report_id is None:
+            return
+        with self._lock:
+            self._check_rebuilt()
+            summary = self.blockchain.report_summaries.get(report_id)
+            current = self._deadlines.get(report_id)
+            if summary is not None and self._is_open(summary):
+                if current is None or current[0] != summary["sla_deadline"]:
+                    self._seq += 1
+                    self._deadlines[report_id] = (summary["sla_deadline"], self._seq)
+                    self._overdue.pop(report_id, None)
+                    heapq.heappush(self._heap, (summary["sla_deadline"], self._seq, report_id))
+            elif current is not None:
+                del self._deadlines[report_id]
+                self._overdue.pop(report_id, None)
+
+    def _advance(self, now):
+        # Same boundary as Blockchain.sla_state: overdue once deadline < now.
+        # Entries only move one way, so `now` must not go backwards between calls.
+        while self._heap and self._heap[0][0] < now:
+            deadline, seq, report_id = heapq.heappop(self._heap)
+            if self._deadlines.get(report_id) == (deadline, seq):
+                self._overdue[report_id] = deadline
+
+    def overdue(self, now=None, limit=None):
+        """
+        Returns (report_ids, total): open reports past their deadline, most overdue first.
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._check_rebuilt()
+            self._advance(now)
+            total = len(self._overdue)
+            if limit is None:
+                items = sorted(self._overdue.items(), key=lambda item: item[1])
+            else:
+                items = heapq.nsmallest(limit, self._overdue.items(), key=lambda item: item[1])
+        return [report_id for report_id, _ in items], total
+
+    def upcoming(self, within, now=None, limit=50):
+        """
+        Returns open reports whose deadline falls in the next `within` seconds,
+        soonest first. Walks only the top of the heap: O(limit log limit).
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._check_rebuilt()
+            self._advance(now)
+            heap = self._heap
+            found = []
+            frontier = [(heap[0], 0)] if heap else []
+            while frontier and len(found) < limit:
+                entry, position = heapq.heappop(frontier)
+                deadline, seq, report_id = entry
+                if deadline > now + within:
+                    break
+                if self._deadlines.get(report_id) == (deadline, seq):
+                    found.append(report_id)
+                for child in (2 * position + 1, 2 * position + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+        return found
+
+    # ---------- SWEEPER ----------
+
+    def sweep(self, now=None):
+        """
+        Appends an "SLA Breached" block to every overdue report that has none yet.
+        Not a status change: the report keeps its status. Returns the number appended.
+        """
+        now = now if now is not None else time.time()
+        self.blockchain.refresh()
+        report_ids, _ = self.overdue(now)
+        appended = 0
+        for report_id in report_ids:
+            summary = self.blockchain.get_report_summary(report_id)
+            if summary is None or summary.get("sla_breached"):
+                continue
+
+            def still_unmarked(blockchain, report_id=report_id):
+                # Re-checked under the journal lock: another worker may have marked it
+                current = blockchain.get_report_summary(report_id)
+                return (current is not None and not current.get("sla_breached")
+                        and blockchain.sla_state(current, now) == "overdue")
+
+            block = self.blockchain.create_block_if(
+                still_unmarked, SLA_BREACHED, report_id, "System",
+                {"sla_deadline": summary["sla_deadline"], "status": summary["status"]},
+            )
+            appended += block is not None
+        return appended
+
+    def start_sweeper(self, interval=SWEEP_SECONDS):
+        """
+        Starts the sweeper thread once per process (call after fork under gunicorn).
+        """
+        if self._sweeper_pid == os.getpid():
+            return
+        self._sweeper_pid = os.getpid()
+        threading.Thread(target=self._sweep_loop, args=(interval,), name="sla-sweeper", daemon=True).start()
+
+    def _sweep_loop(self, interval):
+        while True:
+            try:
+                appended = self.sweep()
+                if appended:
+                    print(f"SLA sweeper: marked {appended} report(s) as breached.")
+            except Exception as e:
+                print(f"WARNING: SLA sweep failed: {e}")
+            time.sleep(interval)
@@ -91,3 +91,87 @@ async function fetchWithAuth(url, options = {}) {
 
   return response;
 }
+
+// ---------- REPORT HELPERS ----------
+
+/**
+ * Returns the AI results for a report timeline. When the backend runs
+ * analysis asynchronously the results arrive in a later "AI Analyzed" block,
+ * otherwise they are stored on the "Created" block.
+ */
+function getAiResults(timeline) {
+  const created = timeline.find(b => b.action_type === "Created") || { data: {} };
+  const analyzed = timeline.filter(b => b.action_type === "AI Analyzed").pop();
+  const source = analyzed ? analyzed.data : created.data;
+  return {
+    text: source.ai_text || 'N/A',
+    image: source.ai_image || 'N/A',
+  };
+}
+
+// ---------- DELTA SYNC ----------
+
+/**
+ * Keeps a local copy of report timelines in sync with /get_reports, using the
+ * chain index as a cursor so each refresh only downloads blocks appended since
+ * the previous one. `reports` is a dict report_id -> timeline (list of blocks).
+ */
+function createReportSync(role) {
+  const state = { reports: {}, cursor: -1 };
+
+  // Returns the number of new blocks merged in.
+  state.sync = async function () {
+    const res = await fetchWithAuth(`${API_BASE_URL}/get_reports?role=${role}&since_index=${state.cursor}`);
+    if (!res.ok) throw new Error(`Server error: ${res.status}`);
+    const delta = await res.json();
+
+    if (delta.high_water_mark < state.cursor) {
+      // The server's chain was reset; start over from scratch.
+      state.reports = {};
+      state.cursor = -1;
+      return state.sync();
+    }
+
+    for (const block of delta.blocks) {
+      if (!state.reports[block.report_id]) state.reports[block.report_id] = [];
+      state.reports[block.report_id].push(block);
+    }
+    state.cursor = delta.high_water_mark;
+    return delta.blocks.length;
+  };
+
+  // Merges one pushed block; returns false if it was already seen.
+  state.apply = function (block) {
+    if (block.index <= state.cursor) return false;
+    if (!state.reports[block.report_id]) state.reports[block.report_id] = [];
+    state.reports[block.report_id].push(block);
+    state.cursor = block.index;
+    return true;
+  };
+
+  return state;
+}
+
+/**
+ * Subscribes a report sync to the /events push stream, calling onChange()
+ * whenever a new block is merged. While the stream is open `sync.live` is
+ * true, so dashboards can skip their polling fallback.
+ */
+function subscribeToBlocks(sync, onChange) {
+  if (!window.EventSource) return null;
+
+  const token = encodeURIComponent(getAuthToken());
+  // last_event_id resumes right after what the initial sync already fetched;
+  // on reconnects the browser sends Last-Event-ID itself.
+  const source = new EventSource(`${API_BASE_URL}/events?token=${token}&last_event_id=${sync.cursor}`);
+
+  source.onopen = () => { sync.live = true; };
+  source.onerror = () => { sync.live = false; };
+  source.addEventListener('block', (event) => {
+    if (sync.apply(JSON.parse(event.data))) onChange();
+  });
+  return source;
+}
+
+// How often dashboards poll for new blocks (ms)
+const REPORT_POLL_INTERVAL = 15000;
@@ -0,0 +1,55 @@
+# gunicorn.conf.py
+import os
+import threading
+
+# Import the app once in the master so that everything loaded at import time
+# (and the AI weights loaded in on_starting) is shared with the workers via copy-on-write.
+preload_app = True
+
+# Loading the models can take a while on a cold box; don't let the master kill workers meanwhile.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+
+# Threaded workers: an open /events stream holds one thread, not the whole worker,
+# and concurrent report submissions in one process can share an inference micro-batch.
+# Keep threads above SSE_MAX_SUBSCRIBERS so streams can never take every thread.
+SSE_MAX_SUBSCRIBERS = int(os.environ.get('SSE_MAX_SUBSCRIBERS', '50'))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# (gunicorn switches sync workers to gthread whenever threads > 1)
+threads = int(os.environ.get('GUNICORN_THREADS', str(SSE_MAX_SUBSCRIBERS + 16) if worker_class == 'gthread' else '1'))
+
+PRELOAD_MODELS = os.environ.get('AI_PRELOAD', 'true').lower() == 'true'
+WARMUP_MODELS = os.environ.get('AI_WARMUP', 'true').lower() == 'true'
+SLA_SWEEPER = os.environ.get('SLA_SWEEPER', 'false').lower() == 'true'
+
+
+def on_starting(server):
+    if server.cfg.workers > 1 and os.environ.get('CHAIN_STORAGE', 'json').lower() != 'journal':
+        server.log.warning("Running %d workers with CHAIN_STORAGE=json: workers will overwrite each "
+                           "other's chain.json. Set CHAIN_STORAGE=journal.", server.cfg.workers)
+    if PRELOAD_MODELS:
+        from backend import ai_module
+        ai_module.preload_models()
+
+
+def post_fork(server, worker):
+    from gunicorn.workers.sync import SyncWorker
+    if isinstance(worker, SyncWorker):
+        # One request at a time: a live stream would block the worker until it closes
+        # (and trip the timeout), so dashboards fall back to polling instead.
+        from backend.app import block_broadcaster
+        block_broadcaster.max_subscribers = 0
+    # Warm up in the background (torch thread pools must be created after fork),
+    # so /health answers immediately while the first inference initialises.
+    if WARMUP_MODELS:
+        from backend import ai_module
+        threading.Thread(target=ai_module.warmup, name="ai-warmup", daemon=True).start()
+    # The SLA sweeper thread must also start after fork; workers racing to mark
+    # the same report is safe (see SLATracker.sweep).
+    if SLA_SWEEPER:
+        from backend.app import sla_tracker
+        sla_tracker.start_sweeper()
+    # With ASYNC_ANALYSIS, every worker retries reports whose analysis was lost
+    # with a worker that exited (see PendingAnalyses); the first result wins.
+    from backend.app import pending_analyses
+    if pending_analyses is not None:
+        pending_analyses.start_sweeper()
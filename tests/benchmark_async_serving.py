@@ -0,0 +1,303 @@
+"""
+Compares the gunicorn deployments (sync workers, and the threaded workers
+gunicorn.conf.py runs by default, as in the Procfile) with the ASGI mode
+(uvicorn backend.asgi:app) under the load that hurts sync workers most: slow
+uploads and slow inference next to dashboard polling and live streams.
+
+For each mode a server is started on a synthetic chain with MOCK_AI=true and a
+simulated model latency (MOCK_AI_LATENCY_MS), then for --duration seconds:
+
+  uploads     --uploads clients each submit reports whose multipart body is
+              trickled over --upload-seconds, followed by the (mock) inference
+  dashboard   --dashboards clients poll GET /get_reports?view=summary
+  streams     --streams clients hold GET /events open; the server closes each
+              stream after --stream-seconds and the client reconnects, and
+              the open ones are dropped by the client at the end
+
+Reported per mode: dashboard p50/p99 latency, requests per second and
+errors, the end-to-end submit time, and stream connections, errors and
+events received (sync workers refuse streams with 503 by design). All modes
+run the same number of worker processes (--workers).
+
+Usage:
+    python tests/benchmark_async_serving.py [--modes sync,gthread,asgi] [--workers 2] [--dashboards 50]
+                                            [--uploads 8] [--streams 10] [--duration 15] [--output async.json]
+Requires gunicorn and uvicorn (see requirements.txt).
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+
+from benchmark_suite import PASSWORD, build_chain, evidence_images, summarize
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD_METHOD = "pbkdf2:sha256:1000"  # keeps logins out of the measurement
+
+
+def gunicorn_command(port, workers):
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+            "-w", str(workers), "-b", f"127.0.0.1:{port}", "backend.app:app"]
+
+
+def uvicorn_command(port, workers):
+    return [sys.executable, "-m", "uvicorn", "backend.asgi:app", "--workers", str(workers),
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+
+
+# mode -> (command, extra environment)
+MODES = {
+    "sync": (gunicorn_command, {"GUNICORN_WORKER_CLASS": "sync"}),
+    "gthread": (gunicorn_command, {"GUNICORN_WORKER_CLASS": "gthread"}),
+    "asgi": (uvicorn_command, {}),
+}
+
+
+# ---------- SERVER ----------
+
+def start_server(mode, directory, port, args):
+    env = dict(
+        os.environ,
+        MOCK_AI="true",
+        MOCK_AI_LATENCY_MS=str(args.inference_ms),
+        AI_PRELOAD="false",
+        AI_WARMUP="false",
+        CHAIN_STORAGE="journal",
+        CHAIN_DATA_DIR=directory,
+        CHAIN_SNAPSHOT_EVERY="0",
+        UPLOAD_FOLDER=os.path.join(directory, "uploads"),
+        PASSWORD_HASH_METHOD=PASSWORD_METHOD,
+        WEB_CONCURRENCY=str(args.workers),
+        SSE_MAX_STREAM_SECONDS=str(args.stream_seconds),
+        SSE_HEARTBEAT_SECONDS="1",
+    )
+    command, extra_env = MODES[mode]
+    env.update(extra_env)
+    server = subprocess.Popen(command(port, args.workers), cwd=ROOT_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if request(port, "GET", "/health")[0] == 200:
+                return server
+        except OSError:
+            pass
+        if server.poll() is not None:
+            break
+        time.sleep(0.2)
+    stop_server(server)
+    raise RuntimeError(f"{mode} server did not start (is it installed?)")
+
+
+def stop_server(server):
+    try:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=15)
+    except ProcessLookupError:
+        pass  # already exited
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+
+# ---------- CLIENTS ----------
+
+def request(port, method, path, body=None, headers=None, timeout=60):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def login(port, user_id):
+    status, body = request(port, "POST", "/login", json.dumps({
+        "user_id": user_id, "password": PASSWORD, "device_hash": "bench",
+    }), {"Content-Type": "application/json"})
+    if status != 200:
+        raise RuntimeError(f"login failed for {user_id}: {status} {body[:200]}")
+    return json.loads(body)["token"]
+
+
+def multipart(fields, file_name, file_bytes):
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="evidence"; filename="{file_name}"\r\n'
+                 f'Content-Type: image/png\r\n\r\n'.encode() + file_bytes + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def slow_upload(port, token, body, content_type, seconds, pieces=10):
+    """
+    Sends the body in `pieces` parts spread over `seconds`, like a phone on a poor connection.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    try:
+        conn.putrequest("POST", "/submit_report")
+        conn.putheader("Authorization", f"Bearer {token}")
+        conn.putheader("Content-Type", content_type)
+        conn.putheader("Content-Length", str(len(body)))
+        conn.endheaders()
+        step = -(-len(body) // pieces)
+        for offset in range(0, len(body), step):
+            conn.send(body[offset:offset + step])
+            time.sleep(seconds / pieces)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def run_load(port, args):
+    admin = login(port, "bench-admin-0@school.test")
+    reporter = login(port, "bench-reporter-0@school.test")
+    images = evidence_images(args.uploads * 4)
+    dashboard_path = "/get_reports?" + urllib.parse.urlencode({"role": "Admin", "view": "summary", "limit": "50"})
+    stop_at = time.monotonic() + args.duration
+    lock = threading.Lock()
+    dashboard_samples, upload_samples = [], []
+    errors = {"dashboard": 0, "uploads": 0}
+    streams = {"connections": 0, "errors": 0, "events": 0}
+
+    def dashboard_client():
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                ok = request(port, "GET", dashboard_path, headers={"Authorization": f"Bearer {admin}"})[0] == 200
+            except OSError:
+                ok = False
+            with lock:
+                dashboard_samples.append(time.perf_counter() - start)
+                errors["dashboard"] += not ok
+
+    def upload_client(client_id):
+        i = 0
+        while time.monotonic() < stop_at:
+            body, content_type = multipart({
+                # Distinct descriptions so the analysis cache doesn't skip the (mock) model
+                "student_id": f"S{client_id}", "description": f"Benchmark upload {client_id}-{i} {uuid.uuid4()}",
+                "date": "2024-01-01",
+            }, "evidence.png", images[(client_id * 4 + i) % len(images)])
+            start = time.perf_counter()
+            try:
+                ok = slow_upload(port, reporter, body, content_type, args.upload_seconds) == 200
+            except OSError:
+                ok = False
+            with lock:
+                upload_samples.append(time.perf_counter() - start)
+                errors["uploads"] += not ok
+            i += 1
+
+    def stream_client():
+        while time.monotonic() < stop_at:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            try:
+                conn.request("GET", "/events", headers={"Authorization": f"Bearer {admin}"})
+                response = conn.getresponse()
+                ok = response.status == 200
+                events = 0
+                # Heartbeats arrive every second, so readline never blocks for long
+                while ok and time.monotonic() < stop_at:
+                    line = response.readline()
+                    if not line:
+                        break  # the server closed the stream (SSE_MAX_STREAM_SECONDS)
+                    events += line.startswith(b"event: block")
+            except OSError:
+                ok, events = False, 0
+            finally:
+                conn.close()  # at the end of the run: a client disconnect
+            with lock:
+                streams["connections"] += 1
+                streams["errors"] += not ok
+                streams["events"] += events
+            if not ok:
+                time.sleep(1)  # like EventSource's retry delay
+
+    threads = [threading.Thread(target=dashboard_client) for _ in range(args.dashboards)]
+    threads += [threading.Thread(target=upload_client, args=(i,)) for i in range(args.uploads)]
+    threads += [threading.Thread(target=stream_client) for _ in range(args.streams)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    dashboard = summarize(dashboard_samples) if dashboard_samples else {"count": 0}
+    dashboard["requests_per_s"] = round(len(dashboard_samples) / elapsed, 1)
+    dashboard["errors"] = errors["dashboard"]
+    uploads = summarize(upload_samples) if upload_samples else {"count": 0}
+    uploads["errors"] = errors["uploads"]
+    return {"dashboard": dashboard, "submit_report": uploads, "events": streams}
+
+
+# ---------- DRIVER ----------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="sync,gthread,asgi", help="comma-separated: sync, gthread, asgi")
+    parser.add_argument("--workers", type=int, default=2, help="server processes in every mode")
+    parser.add_argument("--dashboards", type=int, default=50, help="concurrent dashboard pollers")
+    parser.add_argument("--uploads", type=int, default=8, help="concurrent slow uploaders")
+    parser.add_argument("--streams", type=int, default=10, help="concurrent /events clients")
+    parser.add_argument("--stream-seconds", type=float, default=5.0, help="SSE_MAX_STREAM_SECONDS for the run")
+    parser.add_argument("--upload-seconds", type=float, default=3.0, help="time to trickle one upload body")
+    parser.add_argument("--inference-ms", type=int, default=500, help="simulated model latency per batch")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load per mode")
+    parser.add_argument("--blocks", type=int, default=5000, help="synthetic chain size")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            **{key: value for key, value in vars(args).items() if key not in ("output", "port")},
+        },
+        "results": {},
+    }
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"[{mode}] generating a {args.blocks}-block chain...")
+            build_chain(directory, args.blocks, "journal", PASSWORD_METHOD)
+            server = start_server(mode, directory, args.port, args)
+            try:
+                print(f"[{mode}] {args.dashboards} dashboards + {args.uploads} slow uploads + {args.streams} streams "
+                      f"for {args.duration:.0f}s...")
+                report["results"][mode] = run_load(args.port, args)
+            finally:
+                stop_server(server)
+
+    print(json.dumps(report, indent=2))
+    print(f"\n{'mode':<8} {'dash p50 ms':>12} {'dash p99 ms':>12} {'dash req/s':>11} {'dash err':>9} "
+          f"{'submit p50 ms':>14} {'submits':>8} {'submit err':>11} {'streams':>8} {'strm err':>9} {'events':>7}")
+    for mode, result in report["results"].items():
+        dashboard, uploads, streams = result["dashboard"], result["submit_report"], result["events"]
+        print(f"{mode:<8} {dashboard.get('p50_ms', '-'):>12} {dashboard.get('p99_ms', '-'):>12} "
+              f"{dashboard['requests_per_s']:>11} {dashboard['errors']:>9} {uploads.get('p50_ms', '-'):>14} "
+              f"{uploads['count']:>8} {uploads['errors']:>11} {streams['connections']:>8} {streams['errors']:>9} "
+              f"{streams['events']:>7}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
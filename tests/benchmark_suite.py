@@ -0,0 +1,455 @@
+"""
+Reproducible performance benchmarks for the API and the Blockchain class.
+
+For each chain size a synthetic chain (users, reports and follow-up actions)
+is generated into a temporary directory. A fresh interpreter running with
+MOCK_AI=true then loads it and measures:
+
+  routes      register, login, submit_report, get_reports per role (legacy
+              listings, cold and cached, plus view=summary pages) and
+              update_report, through the Flask test client
+  blockchain  load (with and without snapshot), append, lookups and hashing
+
+Latency is reported as p50 / p99 / mean in milliseconds plus ops per second.
+Results are saved as JSON; --compare prints the metrics whose p50 got slower
+than in a previous run and exits with status 1 if any did.
+
+Usage:
+    python tests/benchmark_suite.py [--sizes 10000,100000,1000000] [--requests 200]
+                                    [--storage journal|json] [--output bench.json]
+                                    [--compare previous.json]
+    # Routes only, against a running server (MOCK_AI=true) and its own chain:
+    python tests/benchmark_suite.py --base-url http://127.0.0.1:5000
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.append(BACKEND_DIR)
+
+PASSWORD = "bench-password"
+STATUS_UPDATES = ["Under Review", "Need More Info", "Escalated to Validator", "Commented", "Resolved", "Validated"]
+DESCRIPTION = "Synthetic benchmark report: repeated name-calling in the corridor and group chat. "
+
+
+# ---------- STATS ----------
+
+def summarize(samples):
+    """
+    samples: per-operation durations in seconds.
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    total = sum(ordered)
+    return {
+        "count": n,
+        "p50_ms": round(ordered[(n - 1) // 2] * 1000, 4),
+        "p99_ms": round(ordered[min(n - 1, int(n * 0.99))] * 1000, 4),
+        "mean_ms": round(total / n * 1000, 4),
+        "ops_per_s": round(n / total, 1) if total else None,
+    }
+
+
+def measure(operation, iterations, setup=None):
+    """
+    Runs operation(i) `iterations` times and summarizes the durations; setup(i),
+    if given, runs untimed before each call. operation returns False on failure.
+    """
+    samples = []
+    errors = 0
+    for i in range(iterations):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        ok = operation(i)
+        samples.append(time.perf_counter() - start)
+        errors += ok is False
+    result = summarize(samples)
+    result["errors"] = errors
+    return result
+
+
+# ---------- SYNTHETIC CHAIN ----------
+
+def build_chain(directory, blocks, storage, password_method, seed=42):
+    """
+    Writes a chain of `blocks` blocks: 1% user registrations, ~30% new reports,
+    the rest status updates and comments on existing reports.
+    """
+    os.environ.setdefault('CHAIN_FSYNC_EVERY', '100000')
+    from blockchain_module import Blockchain
+    from werkzeug.security import generate_password_hash
+
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(PASSWORD, password_method)
+    bc = Blockchain(
+        "journal",
+        os.path.join(directory, "chain.json"),
+        os.path.join(directory, "chain.jsonl"),
+        snapshot_file=os.path.join(directory, "chain.snapshot"),
+        snapshot_every=0,
+    )
+
+    def register(user_id, role):
+        bc.create_block("Register", None, "System", {
+            "user_id": user_id, "password_hash": password_hash, "role": role, "device_hash": "bench",
+        })
+
+    for i in range(5):
+        register(f"bench-admin-{i}@school.test", "Admin")
+        register(f"bench-validator-{i}@school.test", "Validator")
+    reporters = [f"bench-reporter-{i}@school.test" for i in range(max(10, blocks // 100))]
+    for user_id in reporters:
+        register(user_id, "Reporter")
+
+    reports = []
+    while len(bc.chain) < blocks:
+        if not reports or rng.random() < 0.3:
+            report_id = f"bench-report-{len(bc.chain)}"
+            reports.append(report_id)
+            bc.create_block("Created", report_id, "Reporter", {
+                "reporter_email": rng.choice(reporters),
+                "student_id": f"S{rng.randrange(100000)}",
+                "description": DESCRIPTION * rng.randrange(1, 6),
+                "witness": "",
+                "evidence": f"{report_id}.jpg",
+                "ai_text": {"toxic": round(rng.random(), 4), "insult": round(rng.random(), 4)},
+                "ai_image": [{"label": "person", "score": round(rng.random(), 4)}],
+                "status": "Submitted",
+                "created_at": time.time(),
+            })
+        else:
+            action = rng.choice(STATUS_UPDATES)
+            bc.create_block(action, rng.choice(reports), rng.choice(["Admin", "Validator"]),
+                            {"remarks": "Benchmark follow-up."})
+        if len(bc.chain) % 100000 == 0:
+            print(f"  ... {len(bc.chain)} blocks")
+
+    bc.sync()
+    if storage == "json":
+        bc.export_chain(os.path.join(directory, "chain.json"))
+        os.remove(os.path.join(directory, "chain.jsonl"))
+    else:
+        bc.save_snapshot()
+    bc.close()
+
+
+# ---------- CLIENTS ----------
+
+class TestClientAdapter:
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, path, token=None, params=None):
+        r = self.client.get(path, query_string=params, headers=_auth(token))
+        return r.status_code
+
+    def post_json(self, path, payload, token=None):
+        r = self.client.post(path, json=payload, headers=_auth(token))
+        return r.status_code, r.get_json(silent=True)
+
+    def post_form(self, path, fields, file_name, file_bytes, token=None):
+        data = dict(fields, evidence=(io.BytesIO(file_bytes), file_name))
+        r = self.client.post(path, data=data, headers=_auth(token), content_type="multipart/form-data")
+        return r.status_code, r.get_json(silent=True)
+
+
+class HTTPAdapter:
+    def __init__(self, base_url):
+        import requests
+        self.session = requests.Session()
+        self.base_url = base_url.rstrip("/")
+
+    def get(self, path, token=None, params=None):
+        return self.session.get(self.base_url + path, params=params, headers=_auth(token)).status_code
+
+    def post_json(self, path, payload, token=None):
+        r = self.session.post(self.base_url + path, json=payload, headers=_auth(token))
+        return r.status_code, _json_or_none(r)
+
+    def post_form(self, path, fields, file_name, file_bytes, token=None):
+        r = self.session.post(self.base_url + path, data=fields, files={"evidence": (file_name, file_bytes)},
+                              headers=_auth(token))
+        return r.status_code, _json_or_none(r)
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def _json_or_none(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def evidence_images(count, seed=7):
+    """
+    Small distinct PNGs, so uploads aren't all deduplicated.
+    """
+    from PIL import Image
+    rng = random.Random(seed)
+    images = []
+    for _ in range(count):
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 64), tuple(rng.randrange(256) for _ in range(3))).save(buffer, "PNG")
+        images.append(buffer.getvalue())
+    return images
+
+
+# ---------- ROUTE BENCHMARKS ----------
+
+def bench_routes(client, requests_per_route, listing_requests, clear_listing_cache=None, synthetic_users=True):
+    rng = random.Random(1)
+    results = {}
+    run_id = int(time.time() * 1000)
+
+    def login(user_id):
+        status, body = client.post_json("/login", {"user_id": user_id, "password": PASSWORD, "device_hash": "bench"})
+        if status != 200:
+            raise RuntimeError(f"login failed for {user_id}: {status} {body}")
+        return body["token"]
+
+    if not synthetic_users:
+        # Against a live server: create the accounts the benchmark logs in with
+        for role, user_id in (("Reporter", "bench-reporter-0@school.test"),
+                              ("Admin", "bench-admin-0@school.test"),
+                              ("Validator", "bench-validator-0@school.test")):
+            client.post_json("/register", {"user_id": user_id, "password": PASSWORD, "role": role, "device_hash": "bench"})
+
+    results["register"] = measure(
+        lambda i: client.post_json("/register", {
+            "user_id": f"bench-new-{run_id}-{i}@school.test", "password": PASSWORD,
+            "role": "Reporter", "device_hash": "bench",
+        })[0] == 200,
+        requests_per_route,
+    )
+    results["login"] = measure(
+        lambda i: client.post_json("/login", {
+            "user_id": "bench-reporter-0@school.test", "password": PASSWORD, "device_hash": "bench",
+        })[0] == 200,
+        requests_per_route,
+    )
+
+    tokens = {
+        "Reporter": login("bench-reporter-0@school.test"),
+        "Admin": login("bench-admin-0@school.test"),
+        "Validator": login("bench-validator-0@school.test"),
+    }
+
+    listings = [
+        ("get_reports[Reporter]", "Reporter", {"role": "Reporter"}),
+        ("get_reports[Admin]", "Admin", {"role": "Admin"}),
+        ("get_reports[Validator]", "Validator", {"role": "Validator"}),
+        ("get_reports[Admin,view=summary]", "Admin", {"role": "Admin", "view": "summary", "limit": "50"}),
+        ("get_reports[Validator,status]", "Validator", {"role": "Validator", "status": "Escalated to Validator", "limit": "50"}),
+    ]
+    for name, role, params in listings:
+        setup = (lambda i: clear_listing_cache()) if clear_listing_cache else None
+        results[name] = measure(lambda i: client.get("/get_reports", tokens[role], params) == 200,
+                                listing_requests, setup=setup)
+    # Same listing served from the response cache (chain unchanged between requests)
+    results["get_reports[Admin,cached]"] = measure(
+        lambda i: client.get("/get_reports", tokens["Admin"], {"role": "Admin"}) == 200, requests_per_route,
+    )
+
+    images = evidence_images(requests_per_route)
+    report_ids = []
+
+    def submit(i):
+        status, body = client.post_form("/submit_report", {
+            "student_id": f"S{i}", "description": DESCRIPTION, "date": "2024-01-01",
+        }, f"evidence-{i}.png", images[i], tokens["Reporter"])
+        if status == 200:
+            report_ids.append(body["report_id"])
+        return status == 200
+
+    results["submit_report"] = measure(submit, requests_per_route)
+    results["update_report"] = measure(
+        lambda i: client.post_json("/update_report", {
+            "report_id": rng.choice(report_ids) if report_ids else "missing",
+            "action_type": rng.choice(STATUS_UPDATES), "remarks": "Benchmark update.",
+        }, tokens["Admin"])[0] == 200,
+        requests_per_route,
+    )
+    return results
+
+
+# ---------- BLOCKCHAIN MICRO-BENCHMARKS ----------
+
+def bench_blockchain(bc, directory, storage, iterations):
+    from blockchain_module import Blockchain
+
+    rng = random.Random(2)
+    results = {}
+    paths = (os.path.join(directory, "chain.json"), os.path.join(directory, "chain.jsonl"))
+
+    loads = max(1, min(5, iterations // 100))
+    results["load"] = measure(
+        lambda i: bool(Blockchain(storage, *paths, snapshot_file=os.path.join(directory, "chain.snapshot"),
+                                  snapshot_every=0).chain),
+        loads,
+    )
+    if storage == "journal":
+        results["load[no snapshot]"] = measure(
+            lambda i: bool(Blockchain(storage, *paths, snapshot_file=os.path.join(directory, "missing.snapshot"),
+                                      snapshot_every=0).chain),
+            loads,
+        )
+
+    user_ids = list(bc.users)
+    report_ids = list(bc.report_summaries)
+    reporters = list(bc.reporter_reports)
+    blocks = bc.chain
+
+    lookups = iterations * 10
+    results["get_user"] = measure(lambda i: bc.get_user(rng.choice(user_ids)) is not None, lookups)
+    results["get_report_summary"] = measure(lambda i: bc.get_report_summary(rng.choice(report_ids)) is not None, lookups)
+    results["get_report_timeline"] = measure(lambda i: bool(bc.get_report_timeline(rng.choice(report_ids))), lookups)
+    results["get_reports_for_reporter"] = measure(
+        lambda i: bc.get_reports_for_reporter(rng.choice(reporters)) is not None, iterations)
+    results["query_reports[status,limit=50]"] = measure(
+        lambda i: bc.query_reports(status=["Under Review"], limit=50) is not None, iterations)
+    results["hash"] = measure(lambda i: bool(bc.hash(rng.choice(blocks))), lookups)
+    results["hash_data"] = measure(lambda i: bool(bc.hash_data(rng.choice(blocks).get("data") or {})), lookups)
+    results["append"] = measure(
+        lambda i: bool(bc.create_block("Commented", rng.choice(report_ids), "Admin", {"remarks": "Micro-benchmark."})),
+        iterations,
+    )
+    return results
+
+
+# ---------- DRIVER ----------
+
+def run_size(directory, storage, requests_per_route, listing_requests):
+    """
+    Runs inside a fresh interpreter whose environment points the app at `directory`.
+    """
+    start = time.perf_counter()
+    import app as app_module
+    import_seconds = time.perf_counter() - start
+
+    client = TestClientAdapter(app_module.app.test_client())
+    routes = bench_routes(client, requests_per_route, listing_requests,
+                          clear_listing_cache=app_module.listing_cache.clear)
+    blockchain = bench_blockchain(app_module.blockchain, directory, storage, requests_per_route)
+    return {
+        "app_import_seconds": round(import_seconds, 3),
+        "chain_length": len(app_module.blockchain.chain),
+        "reports": len(app_module.blockchain.report_summaries),
+        "routes": routes,
+        "blockchain": blockchain,
+    }
+
+
+def benchmark_size(size, args):
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generating a synthetic chain of {size} blocks ({args.storage})...")
+        started = time.perf_counter()
+        build_chain(directory, size, args.storage, args.password_method)
+        print(f"  generated in {time.perf_counter() - started:.1f}s; benchmarking...")
+
+        env = dict(
+            os.environ,
+            MOCK_AI="true",
+            AI_WARMUP="false",
+            CHAIN_DATA_DIR=directory,
+            CHAIN_STORAGE=args.storage,
+            CHAIN_SNAPSHOT_EVERY="0",
+            UPLOAD_FOLDER=os.path.join(directory, "uploads"),
+            PASSWORD_HASH_METHOD=args.password_method,
+        )
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-size", directory, "--storage", args.storage,
+             "--requests", str(args.requests), "--listing-requests", str(args.listing_requests)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(current, baseline_path, threshold):
+    """
+    Prints metrics whose p50 regressed by more than `threshold`; returns their count.
+    """
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    regressions = 0
+    for size, result in current["results"].items():
+        old = baseline.get("results", {}).get(size)
+        if not old:
+            continue
+        for section in ("routes", "blockchain"):
+            for name, metrics in result.get(section, {}).items():
+                previous = old.get(section, {}).get(name)
+                if not previous or not previous.get("p50_ms"):
+                    continue
+                ratio = metrics["p50_ms"] / previous["p50_ms"]
+                if ratio > 1 + threshold:
+                    regressions += 1
+                    print(f"REGRESSION [{size}] {section}/{name}: p50 {previous['p50_ms']} -> "
+                          f"{metrics['p50_ms']} ms ({ratio:.2f}x)")
+    if not regressions:
+        print(f"No p50 regressions above {threshold:.0%} against {baseline_path}.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000", help="comma-separated chain sizes, e.g. 10000,100000,1000000")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route / micro-benchmark iterations")
+    parser.add_argument("--listing-requests", type=int, default=20,
+                        help="requests per uncached get_reports variant (full listings are slow on big chains)")
+    parser.add_argument("--storage", choices=("journal", "json"), default="journal")
+    parser.add_argument("--password-method", default="scrypt", help="PASSWORD_HASH_METHOD for the run")
+    parser.add_argument("--base-url", help="benchmark the routes of a running server instead")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="previous results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed p50 slowdown for --compare")
+    parser.add_argument("--run-size", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size:
+        print(json.dumps(run_size(args.run_size, args.storage, args.requests, args.listing_requests)))
+        return
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": args.storage,
+            "requests": args.requests,
+            "listing_requests": args.listing_requests,
+            "password_method": args.password_method,
+        },
+        "results": {},
+    }
+    if args.base_url:
+        report["meta"]["base_url"] = args.base_url
+        client = HTTPAdapter(args.base_url)
+        report["results"]["server"] = {
+            "routes": bench_routes(client, args.requests, args.listing_requests, synthetic_users=False),
+        }
+    else:
+        for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            report["results"][str(size)] = benchmark_size(size, args)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
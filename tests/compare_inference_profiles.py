@@ -0,0 +1,140 @@
+"""
+Compares the fp32 and cpu-int8 inference profiles of ai_module on a fixed
+sample set and reports accuracy deltas and latency, so we can decide whether
+AI_PROFILE=cpu-int8 is safe to enable.
+
+Usage:
+    python tests/compare_inference_profiles.py [--output results.json]
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend'))
+import ai_module
+from PIL import Image
+
+SAMPLE_TEXTS = [
+    "I hope you have a wonderful day at school.",
+    "You are stupid and ugly, nobody likes you.",
+    "I am going to hurt you after class.",
+    "Can you help me with the maths homework?",
+    "Everyone in the group chat laughs at her photos.",
+    "Shut up, you idiot, nobody asked you.",
+    "They took my lunch money again today.",
+    "Thanks for sitting with me at lunch.",
+    "If you tell the teacher I will make your life hell.",
+    "He keeps pushing me in the corridor between lessons.",
+    "Great job on the science project!",
+    "You're a worthless loser and should just disappear.",
+]
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend', 'images')
+
+
+def load_sample_images():
+    images = []
+    for name in sorted(os.listdir(IMAGE_DIR)):
+        try:
+            images.append((name, Image.open(os.path.join(IMAGE_DIR, name)).convert("RGB")))
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+    return images
+
+
+def timed(run, classifier, inputs):
+    start = time.perf_counter()
+    outputs = run(classifier, inputs)
+    return outputs, time.perf_counter() - start
+
+
+def run_image_pipeline(classifier, images):
+    return ai_module.run_pipeline(classifier, images, batch_size=len(images))
+
+
+def compare_text(fp32, int8):
+    # Same windowed scoring path that analyze_texts uses in production
+    base, base_time = timed(ai_module.score_texts, fp32, SAMPLE_TEXTS)
+    quant, quant_time = timed(ai_module.score_texts, int8, SAMPLE_TEXTS)
+
+    deltas = []
+    flag_agreement = 0
+    for base_scores, quant_scores in zip(base, quant):
+        base_map = {s['label']: s['score'] for s in base_scores}
+        quant_map = {s['label']: s['score'] for s in quant_scores}
+        deltas.extend(abs(base_map[label] - quant_map.get(label, 0.0)) for label in base_map)
+        base_flags = {label for label, score in base_map.items() if score > 0.5}
+        quant_flags = {label for label, score in quant_map.items() if score > 0.5}
+        flag_agreement += base_flags == quant_flags
+
+    return {
+        "samples": len(SAMPLE_TEXTS),
+        "flag_agreement": flag_agreement / len(SAMPLE_TEXTS),
+        "mean_abs_score_delta": sum(deltas) / len(deltas),
+        "max_abs_score_delta": max(deltas),
+        "fp32_seconds": base_time,
+        "int8_seconds": quant_time,
+    }
+
+
+def compare_image(fp32, int8):
+    samples = load_sample_images()
+    images = [image for _, image in samples]
+    base, base_time = timed(run_image_pipeline, fp32, images)
+    quant, quant_time = timed(run_image_pipeline, int8, images)
+
+    top1_agreement = 0
+    top3_overlap = 0.0
+    top1_deltas = []
+    for base_preds, quant_preds in zip(base, quant):
+        top1_agreement += base_preds[0]['label'] == quant_preds[0]['label']
+        base_top3 = {p['label'] for p in base_preds[:3]}
+        quant_top3 = {p['label'] for p in quant_preds[:3]}
+        top3_overlap += len(base_top3 & quant_top3) / 3
+        quant_scores = {p['label']: p['score'] for p in quant_preds}
+        top1_deltas.append(abs(base_preds[0]['score'] - quant_scores.get(base_preds[0]['label'], 0.0)))
+
+    return {
+        "samples": len(images),
+        "top1_agreement": top1_agreement / len(images),
+        "top3_overlap": top3_overlap / len(images),
+        "mean_abs_top1_score_delta": sum(top1_deltas) / len(top1_deltas),
+        "fp32_seconds": base_time,
+        "int8_seconds": quant_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    from transformers import pipeline
+
+    print("Loading fp32 models...")
+    text_fp32 = pipeline("text-classification", model=ai_module.TEXT_MODEL, return_all_scores=True)
+    image_fp32 = pipeline("image-classification", model=ai_module.IMAGE_MODEL)
+
+    print("Quantizing copies to int8...")
+    text_int8 = ai_module.apply_profile(copy.deepcopy(text_fp32), "cpu-int8")
+    image_int8 = ai_module.apply_profile(copy.deepcopy(image_fp32), "cpu-int8")
+
+    report = {
+        "text_model": ai_module.TEXT_MODEL,
+        "image_model": ai_module.IMAGE_MODEL,
+        "torch_threads": ai_module.TORCH_THREADS,
+        "text": compare_text(text_fp32, text_int8),
+        "image": compare_image(image_fp32, image_int8),
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
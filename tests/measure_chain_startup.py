@@ -0,0 +1,145 @@
+"""
+Measures Blockchain startup time and peak Python memory (tracemalloc) on a
+synthetic chain, for each way a process can load it:
+
+    json      chain.json parsed with json.load, indexes rebuilt
+    journal   chain.jsonl streamed line by line, indexes rebuilt
+    snapshot  chain.snapshot loaded, then only the last --tail journal records replayed
+    compact   chain.jsonl streamed into compact blocks (CHAIN_COMPACT_BLOCKS=true)
+
+retained_mb is what the loaded chain and indexes keep using afterwards.
+
+Each measurement runs in a fresh interpreter so earlier loads don't skew it;
+time and memory are measured in separate runs because tracemalloc slows loading down.
+
+Usage:
+    python tests/measure_chain_startup.py [--blocks 100000] [--tail 1000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.append(BACKEND_DIR)
+from blockchain_module import Blockchain
+
+ACTIONS = ["Under Review", "Commented", "Escalated to Validator", "Validated", "Resolved"]
+
+
+def open_chain(directory, mode, snapshot_every=0, compact=False):
+    return Blockchain(
+        mode,
+        os.path.join(directory, "chain.json"),
+        os.path.join(directory, "chain.jsonl"),
+        snapshot_file=os.path.join(directory, "chain.snapshot"),
+        snapshot_every=snapshot_every,
+        compact=compact,
+    )
+
+
+def build_chain(directory, blocks, tail):
+    """
+    Writes the same synthetic chain as chain.jsonl, chain.json and a snapshot
+    taken `tail` blocks before the tip.
+    """
+    rng = random.Random(42)
+    bc = open_chain(directory, "journal")
+    reports = []
+    for i in range(1, blocks):
+        if i == blocks - tail:
+            bc.save_snapshot()
+        if i % 50 == 1:
+            email = f"user{i}@school.test"
+            bc.create_block("Register", None, email, {"user_id": email, "role": "Reporter", "password_hash": "x" * 100})
+        elif not reports or rng.random() < 0.3:
+            report_id = f"report-{i}"
+            reports.append(report_id)
+            bc.create_block("Created", report_id, "Reporter", {
+                "reporter_email": f"user{rng.randrange(blocks)}@school.test",
+                "student_id": f"S{rng.randrange(10000)}",
+                "description": "Synthetic report description. " * rng.randrange(1, 10),
+                "ai_text_analysis": [{"label": "toxic", "score": rng.random()}],
+            })
+        else:
+            bc.create_block(rng.choice(ACTIONS), rng.choice(reports), f"admin{rng.randrange(5)}@school.test",
+                            {"comment": "Follow-up note."})
+    bc.sync()
+    bc.export_chain(os.path.join(directory, "chain.json"))
+    bc.close()
+
+
+def measure(directory, kind, trace):
+    if kind in ("snapshot", "compact"):
+        mode = "journal"
+    else:
+        mode = kind
+    if kind in ("journal", "compact"):
+        # Hide the snapshot so the whole journal is streamed
+        os.rename(os.path.join(directory, "chain.snapshot"), os.path.join(directory, "chain.snapshot.off"))
+
+    try:
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        bc = open_chain(directory, mode, compact=kind == "compact")
+        seconds = time.perf_counter() - start
+        if trace:
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        if kind in ("journal", "compact"):
+            os.rename(os.path.join(directory, "chain.snapshot.off"), os.path.join(directory, "chain.snapshot"))
+
+    if trace:
+        return {"peak_mb": round(peak / 1024 / 1024, 1), "retained_mb": round(retained / 1024 / 1024, 1)}
+    return {"seconds": round(seconds, 3), "blocks": len(bc.chain), "reports": len(bc.report_summaries)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=100000)
+    parser.add_argument("--tail", type=int, default=1000, help="journal records written after the snapshot")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.dir, args.measure, args.trace)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Building a synthetic chain of {args.blocks} blocks...")
+        build_chain(directory, args.blocks, args.tail)
+        results = {
+            "blocks": args.blocks,
+            "tail": args.tail,
+            "file_mb": {
+                name: round(os.path.getsize(os.path.join(directory, name)) / 1024 / 1024, 1)
+                for name in ("chain.json", "chain.jsonl", "chain.snapshot")
+            },
+        }
+        for kind in ("json", "journal", "snapshot", "compact"):
+            results[kind] = {}
+            for trace in ([], ["--trace"]):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--measure", kind, "--dir", directory] + trace,
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                results[kind].update(json.loads(output.strip().splitlines()[-1]))
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
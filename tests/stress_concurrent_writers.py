@@ -0,0 +1,82 @@
+"""
+Stress test for journal mode: N processes append blocks to the same journal
+concurrently (like N gunicorn workers) and the result must be one valid chain.
+
+Usage:
+    python tests/stress_concurrent_writers.py [--writers 8] [--blocks 200]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend'))
+from blockchain_module import Blockchain
+
+
+def open_chain(directory):
+    return Blockchain("journal", os.path.join(directory, "chain.json"), os.path.join(directory, "chain.jsonl"))
+
+
+def writer(directory, writer_id, blocks, start):
+    bc = open_chain(directory)
+    start.wait()
+    for i in range(blocks):
+        report_id = f"w{writer_id}-r{i}"
+        bc.create_block("Created", report_id, "Reporter", {"reporter_email": f"w{writer_id}@test.com"})
+    bc.close()
+
+
+def verify(bc, expected_blocks):
+    errors = []
+    if len(bc.chain) != expected_blocks:
+        errors.append(f"expected {expected_blocks} blocks, found {len(bc.chain)}")
+    for i, block in enumerate(bc.chain):
+        if block["index"] != i:
+            errors.append(f"block at position {i} has index {block['index']}")
+            break
+        if i and block["previous_hash"] != bc.hash(bc.chain[i - 1]):
+            errors.append(f"block {i} does not link to block {i - 1}")
+            break
+    if len(bc.report_blocks) != expected_blocks - 1:
+        errors.append(f"expected {expected_blocks - 1} indexed reports, found {len(bc.report_blocks)}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--blocks", type=int, default=200, help="blocks per writer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Long-lived reader that must catch up incrementally via refresh()
+        reader = open_chain(directory)
+
+        start = multiprocessing.Event()
+        processes = [
+            multiprocessing.Process(target=writer, args=(directory, w, args.blocks, start))
+            for w in range(args.writers)
+        ]
+        for p in processes:
+            p.start()
+        start.set()
+        for p in processes:
+            p.join()
+            if p.exitcode != 0:
+                print(f"FAILURE: writer exited with code {p.exitcode}")
+                sys.exit(1)
+
+        expected = 1 + args.writers * args.blocks
+        reader.refresh()
+        errors = verify(open_chain(directory), expected) + verify(reader, expected)
+        if errors:
+            for error in errors:
+                print(f"FAILURE: {error}")
+            sys.exit(1)
+        print(f"SUCCESS: {args.writers} writers x {args.blocks} blocks -> one valid chain of {expected} blocks.")
+
+
+if __name__ == "__main__":
+    main()